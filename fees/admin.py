@@ -34,8 +34,10 @@ class ClassFeeAdmin(admin.ModelAdmin):
 
 @admin.register(FeeRecord)
 class FeeRecordAdmin(admin.ModelAdmin):
-    list_display = ('student', 'month', 'status', 'due_date', 'submission_date')
-    list_filter = ('status', 'month')
+    list_display = ('student', 'month', 'status', 'paid_amount', 'pending_amount', 'late_fee', 'arrears', 'due_date', 'submission_date')
+    list_select_related = ('student',)
+    list_filter = ('status', 'period')
+    date_hierarchy = 'period'
 
 @admin.register(FeePayment)
 class FeePaymentAdmin(admin.ModelAdmin):
@@ -47,9 +49,7 @@ class FeePaymentAdmin(admin.ModelAdmin):
         return super().changelist_view(request, extra_context=extra_context)
 
 # Override admin site index to include stats
-from django.utils import timezone
-from datetime import datetime
-from django.db.models import Sum
+from .stats import get_fee_stats
 
 original_index = admin.site.index
 
@@ -57,17 +57,10 @@ def custom_admin_index(request, extra_context=None):
     if extra_context is None:
         extra_context = {}
     
-    current_month = timezone.now().strftime('%B %Y')
-    
-    extra_context['total_students'] = Student.objects.count()
-    extra_context['collected'] = FeePayment.objects.filter(
-        date__month=timezone.now().month, 
-        date__year=timezone.now().year
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    extra_context['pending'] = FeeRecord.objects.filter(
-        month=current_month, 
-        status='Unpaid'
-    ).count()
+    stats = get_fee_stats()
+    extra_context['total_students'] = stats['total_students']
+    extra_context['collected'] = stats['collected']
+    extra_context['pending'] = stats['pending']
     
     return original_index(request, extra_context)
 
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import AgingSnapshot, ClassAging, FeeRecord, StudentAging
+from . import ledger
+
+BUCKETS = ['days_0_30', 'days_31_60', 'days_61_90', 'days_over_90']
+BUCKET_LABELS = {'days_0_30': '0-30 days', 'days_31_60': '31-60 days', 'days_61_90': '61-90 days',
+                 'days_over_90': '90+ days'}
+# Days past due at which a balance enters each bucket; crossing one changes a student's aging
+BOUNDARIES = [0, 31, 61, 91]
+BATCH_SIZE = 500
+
+
+def _bucket_sums(day):
+    def due_between(newest, oldest=None):
+        # Due ``newest``..``oldest`` days before ``day`` (inclusive)
+        q = Q(due_date__lte=day - timedelta(days=newest))
+        if oldest is not None:
+            q &= Q(due_date__gte=day - timedelta(days=oldest))
+        return q
+
+    return {
+        'days_0_30': Sum('pending_amount', filter=due_between(0, 30)),
+        'days_31_60': Sum('pending_amount', filter=due_between(31, 60)),
+        'days_61_90': Sum('pending_amount', filter=due_between(61, 90)),
+        'days_over_90': Sum('pending_amount', filter=due_between(91)),
+        'total': Sum('pending_amount'),
+    }
+
+
+def _outstanding(day):
+    # Balances not yet due aren't receivables to age
+    return FeeRecord.objects.filter(pending_amount__gt=0, due_date__lte=day)
+
+
+def touched_students(day, previous):
+    """Students whose aging may differ from ``previous``: records written since it was taken,
+    balances that crossed a bucket boundary since its date, or records deleted since (stale)."""
+    changed = FeeRecord.objects.filter(updated_at__gte=previous.taken_at).values_list('student_id', flat=True)
+    crossing = Q()
+    for days in BOUNDARIES:
+        crossing |= Q(due_date__gt=previous.date - timedelta(days=days), due_date__lte=day - timedelta(days=days))
+    moved = FeeRecord.objects.filter(crossing, pending_amount__gt=0).values_list('student_id', flat=True)
+    stale = StudentAging.objects.filter(stale=True).values_list('student_id', flat=True)
+    return set(changed.distinct()) | set(moved.distinct()) | set(stale)
+
+
+def recompute_students(student_ids, day):
+    """Replace the StudentAging rows of ``student_ids`` with their balances aged as of ``day``."""
+    student_ids = sorted(student_ids)
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        chunk = student_ids[start:start + BATCH_SIZE]
+        rows = (_outstanding(day).filter(student_id__in=chunk)
+                .values('student_id').annotate(**_bucket_sums(day)).order_by())
+        StudentAging.objects.filter(student_id__in=chunk).delete()
+        StudentAging.objects.bulk_create([
+            StudentAging(student_id=row['student_id'], as_of=day,
+                         **{field: row[field] or ledger.ZERO for field in BUCKETS + ['total']})
+            for row in rows if row['total']
+        ])
+
+
+def take_snapshot(day=None, full=False):
+    """Age outstanding balances as of ``day`` (default today) and store the day's class totals.
+
+    Only students touched since the previous snapshot are recomputed; the first snapshot, or
+    ``full``, recomputes everyone. Re-running a day replaces that day's snapshot.
+    """
+    day = day or date.today()
+    previous = AgingSnapshot.objects.order_by('-date').first()
+    if previous and day < previous.date:
+        raise ValueError(f"There is already a snapshot for {previous.date}; snapshots must move forward.")
+    # Taken before anything is read, so records written during the run are picked up next time
+    started = timezone.now()
+    with transaction.atomic():
+        if full or previous is None:
+            StudentAging.objects.all().delete()
+            student_ids = set(_outstanding(day).values_list('student_id', flat=True).distinct())
+        else:
+            student_ids = touched_students(day, previous)
+        recompute_students(student_ids, day)
+
+        snapshot, _ = AgingSnapshot.objects.update_or_create(
+            date=day, defaults={'taken_at': started, 'students_recomputed': len(student_ids)},
+        )
+        snapshot.classes.all().delete()
+        sums = {field: Sum(field) for field in BUCKETS + ['total']}
+        ClassAging.objects.bulk_create([
+            ClassAging(snapshot=snapshot, student_class=row['student__student_class'], students=row['students'],
+                       **{field: row[field] for field in sums})
+            for row in StudentAging.objects.values('student__student_class')
+            .annotate(students=Count('pk'), **sums).order_by()
+        ])
+    return snapshot
+
+
+def mark_stale(student_id):
+    StudentAging.objects.filter(student_id=student_id).update(stale=True)
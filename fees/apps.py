@@ -9,5 +9,6 @@ class FeesConfig(AppConfig):
         # import signals
         try:
             import fees.signals  # noqa: F401
+            import fees.sqlite  # noqa: F401
         except Exception:
             pass
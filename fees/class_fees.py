@@ -0,0 +1,31 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ClassFee
+
+# Other worker processes notice a ClassFee change through this shared stamp,
+# checked at most every CHECK_INTERVAL seconds.
+VERSION_KEY = 'fees:class-fee-version'
+CHECK_INTERVAL = 5
+
+_state = {'fees': None, 'version': None, 'checked': 0.0}
+
+
+def get_class_fees():
+    """{student_class: fee_amount}, loaded once per process and reloaded after a ClassFee change."""
+    now = time.monotonic()
+    if _state['fees'] is None or now - _state['checked'] > CHECK_INTERVAL:
+        version = cache.get(VERSION_KEY)
+        if _state['fees'] is None or version != _state['version']:
+            _state['fees'] = dict(ClassFee.objects.values_list('student_class', 'fee_amount'))
+            _state['version'] = version
+        _state['checked'] = now
+    return _state['fees']
+
+
+def invalidate_class_fees():
+    _state['fees'] = None
+    # Bump after commit so other processes can't reload the old rows and keep them
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time(), None))
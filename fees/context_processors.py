@@ -1,40 +1,57 @@
+from functools import lru_cache
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.urls import reverse, NoReverseMatch
+from django.utils.functional import SimpleLazyObject
 
-def sidebar_context(request):
-    sidebar = []
-    current_path = request.path
 
+@lru_cache(maxsize=None)
+def resolved_sidebar():
+    """settings.SIDEBAR_CONFIG with every URL reversed, built once per process on first use."""
+    groups = []
     for group in settings.SIDEBAR_CONFIG:
-        group_data = {
-            "title": group["title"],
-            "items": []
-        }
+        items = []
         for item in group["items"]:
             url = "#"
-            is_active = False
-            args = item.get("args", [])
-            
             if "url" in item:
                 try:
-                    url = reverse(item["url"], args=args)
-                    # For generic list, check if current path matches EXACTLY or starts with
-                    # but if it's a list view, we want to match more strictly to avoid highlights overlap
-                    if url != "/" and current_path.startswith(url):
-                        is_active = True
-                    elif url == "/" and current_path == "/":
-                        is_active = True
-                except Exception:
+                    url = reverse(item["url"], args=item.get("args", []))
+                except NoReverseMatch:
                     url = "#"
-            
-            item_data = {
+            items.append({
                 "label": item["label"],
                 "url": url,
                 "icon": item.get("icon", "🔹"),
-                "is_active": is_active,
-                "action": item.get("action", None)
-            }
-            group_data["items"].append(item_data)
-        sidebar.append(group_data)
+                "action": item.get("action", None),
+            })
+        groups.append({"title": group["title"], "items": tuple(items)})
+    return tuple(groups)
+
+
+@receiver(setting_changed)
+def reset_sidebar(setting, **kwargs):
+    if setting in ("SIDEBAR_CONFIG", "ROOT_URLCONF"):
+        resolved_sidebar.cache_clear()
+
+
+def _is_active(url, path):
+    # The dashboard only matches itself; other items also match their sub-pages (add/edit forms)
+    if url == "/":
+        return path == "/"
+    return url != "#" and path.startswith(url)
+
+
+def sidebar_context(request):
+    path = request.path
+
+    def build():
+        return [
+            {"title": group["title"],
+             "items": [dict(item, is_active=_is_active(item["url"], path)) for item in group["items"]]}
+            for group in resolved_sidebar()
+        ]
 
-    return {"SIDEBAR_CONFIG": sidebar}
+    # Only worked out if a template actually renders the sidebar
+    return {"SIDEBAR_CONFIG": SimpleLazyObject(build)}
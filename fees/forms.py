@@ -83,7 +83,7 @@ class ClassFeeForm(forms.ModelForm):
 class FeeRecordForm(forms.ModelForm):
     class Meta:
         model = FeeRecord
-        exclude = ('month', 'due_date') # Automation only
+        exclude = ('period', 'due_date') # Automation only
         widgets = {
             'submission_date': forms.DateInput(attrs={'type': 'date'}),
         }
@@ -96,3 +96,7 @@ class FeePaymentForm(forms.ModelForm):
         widgets = {
             'date': forms.DateInput(attrs={'type': 'date'}),
         }
+
+
+class PaymentImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV or XLSX with roll_no, amount, payment_mode and date columns.")
@@ -0,0 +1,92 @@
+import calendar
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import FeeRecord, GlobalSettings
+from . import ledger
+
+ZERO = ledger.ZERO
+
+
+def late_fee_rate():
+    """GlobalSettings.late_fee_per_day, or zero when no settings row exists."""
+    settings_row = GlobalSettings.objects.only('late_fee_per_day').first()
+    return settings_row.late_fee_per_day if settings_row else ZERO
+
+
+def _month_end(period):
+    return period.replace(day=calendar.monthrange(period.year, period.month)[1])
+
+
+def late_days(due_date, period, settled_on, pending, as_of):
+    """Days a month's fee was overdue as of ``as_of``.
+
+    Counted from the due date until the month was settled (its last payment) or, while a balance
+    is still pending, until ``as_of``; never past the end of the billing month, after which the
+    unpaid balance is carried forward as arrears instead.
+    """
+    if pending > 0:
+        stop = as_of
+    elif settled_on:
+        stop = settled_on
+    else:
+        return 0
+    stop = min(stop, _month_end(period))
+    return max(0, (stop - due_date).days)
+
+
+def _late_fee_expression(period, due_date, as_of, rate):
+    # Every record of a billing month shares its due date, so the fee only varies with whether a
+    # balance is pending and, if not, with the settlement date
+    settled = (FeeRecord.objects.filter(period=period, due_date=due_date, pending_amount__lte=0)
+               .exclude(submission_date__isnull=True)
+               .order_by().values_list('submission_date', flat=True).distinct())
+    by_fee = {}
+    for settled_on in settled:
+        by_fee.setdefault(rate * late_days(due_date, period, settled_on, 0, as_of), []).append(settled_on)
+    whens = [When(pending_amount__gt=0, then=Value(rate * late_days(due_date, period, None, 1, as_of)))]
+    whens += [When(submission_date__in=days, then=Value(fee)) for fee, days in by_fee.items() if fee]
+    return Case(*whens, default=Value(ZERO), output_field=FeeRecord._meta.get_field('late_fee'))
+
+
+def accrue(as_of=None, rate=None):
+    """Recompute late_fee and arrears of every FeeRecord up to the month of ``as_of``.
+
+    Each month's late fee is late_days() x ``rate`` (default late_fee_rate()); its arrears are
+    everything still owed from the student's earlier months: their pending balances, plus the
+    late fees of the months still unpaid, i.e. the previous record's arrears + pending_amount
+    (+ late_fee while that month has a balance). A settled month's late fee is not carried.
+    Both are set-based UPDATEs, two per month, run in the database and touching only rows whose
+    value changes. Balances are the ledger's current ones, so a past ``as_of`` moves the accrual
+    date, not the payments counted. Returns (late fees changed, arrears changed).
+    """
+    as_of = as_of or date.today()
+    rate = late_fee_rate() if rate is None else rate
+    records = FeeRecord.objects.filter(period__lte=ledger.month_start(as_of))
+    groups = records.order_by('period', 'due_date').values_list('period', 'due_date').distinct()
+
+    # A settled month's late fee isn't part of any balance that can be paid, so only unpaid months
+    # carry theirs forward
+    previous = (FeeRecord.objects.filter(student_id=OuterRef('student_id'), period__lt=OuterRef('period'))
+                .order_by('-period')
+                .annotate(owed=F('arrears') + F('pending_amount')
+                          + Case(When(pending_amount__gt=0, then=F('late_fee')), default=Value(ZERO)))
+                .values('owed')[:1])
+    owed = Coalesce(Subquery(previous), Value(ZERO), output_field=FeeRecord._meta.get_field('arrears'))
+
+    fees_changed = arrears_changed = 0
+    with transaction.atomic():
+        periods = []
+        for period, due_date in groups:
+            fee = _late_fee_expression(period, due_date, as_of, rate)
+            fees_changed += (records.filter(period=period, due_date=due_date)
+                             .exclude(late_fee=fee).update(late_fee=fee))
+            if period not in periods:
+                periods.append(period)
+        # Oldest month first, so each month reads its predecessor's final arrears
+        for period in periods:
+            arrears_changed += records.filter(period=period).exclude(arrears=owed).update(arrears=owed)
+    return fees_changed, arrears_changed
@@ -0,0 +1,167 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import ClassFee, FeePayment, FeeRecord, Student
+from .class_fees import get_class_fees
+
+ZERO = Decimal('0.00')
+BATCH_SIZE = 500
+LEDGER_FIELDS = ['expected_amount', 'paid_amount', 'pending_amount', 'status', 'submission_date', 'updated_at']
+
+
+def month_start(day):
+    """The billing period (first day of the month) that ``day`` falls in."""
+    return day.replace(day=1)
+
+
+def next_month(period):
+    return date(period.year + 1, 1, 1) if period.month == 12 else date(period.year, period.month + 1, 1)
+
+
+def expected_fee(student, class_fees):
+    """Effective fee for a student given a {student_class: fee_amount} mapping."""
+    if student.manual_fee is not None:
+        return student.manual_fee
+    return class_fees.get(student.student_class, student.total_fees)
+
+
+def expected_fee_expression():
+    """Same rule as expected_fee() as a Student query expression, for annotate()/aggregate()."""
+    class_fee = ClassFee.objects.filter(student_class=OuterRef('student_class')).values('fee_amount')[:1]
+    return Coalesce('manual_fee', Subquery(class_fee), 'total_fees')
+
+
+def _payment_totals(records):
+    # One grouped query for every (student, month) the batch touches
+    if not records:
+        return {}
+    first = min(r.period for r in records)
+    last = max(r.period for r in records)
+    rows = (FeePayment.objects
+            .filter(student_id__in={r.student_id for r in records}, date__gte=first, date__lt=next_month(last))
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .values('student_id', 'year', 'month')
+            .annotate(total=Sum('amount'), last_date=Max('date')))
+    return {(r['student_id'], date(r['year'], r['month'], 1)): (r['total'], r['last_date']) for r in rows}
+
+
+def refresh_records(records):
+    """Recompute expected/paid/pending and status for the given FeeRecords and save them in bulk.
+
+    Records should come with their student loaded (select_related('student')).
+    """
+    records = list(records)
+    class_fees = get_class_fees()
+    # bulk_update() doesn't apply auto_now
+    now = timezone.now()
+    for start in range(0, len(records), BATCH_SIZE):
+        batch = records[start:start + BATCH_SIZE]
+        totals = _payment_totals(batch)
+        for record in batch:
+            paid, last_date = totals.get((record.student_id, record.period), (ZERO, None))
+            record.expected_amount = expected_fee(record.student, class_fees)
+            record.paid_amount = paid
+            record.pending_amount = max(ZERO, record.expected_amount - paid)
+            record.updated_at = now
+            if record.pending_amount <= 0:
+                record.status = 'Paid'
+                record.submission_date = last_date
+            else:
+                record.status = 'Unpaid'
+                record.submission_date = None
+        FeeRecord.objects.bulk_update(batch, LEDGER_FIELDS)
+    return len(records)
+
+
+def refresh_student_month(student, day):
+    """Ensure the student's FeeRecord for the month containing ``day`` exists and is up to date."""
+    record, _ = FeeRecord.objects.get_or_create(
+        student=student,
+        period=month_start(day),
+        defaults={'due_date': day.replace(day=10), 'status': 'Unpaid'}
+    )
+    record.student = student
+    refresh_records([record])
+    return record
+
+
+def refresh_student(student):
+    return refresh_records(FeeRecord.objects.filter(student=student).select_related('student'))
+
+
+def refresh_class(student_class):
+    # Students with a manual fee are not affected by their class fee
+    return refresh_records(
+        FeeRecord.objects.filter(student__student_class=student_class, student__manual_fee__isnull=True)
+        .select_related('student')
+    )
+
+
+def refresh_months(pairs):
+    """Create any missing FeeRecords for (student_id, day) pairs and refresh each (student, month) once.
+
+    Used after bulk payment inserts, which bypass the per-payment signals.
+    """
+    wanted = {(student_id, month_start(day)) for student_id, day in pairs}
+    FeeRecord.objects.bulk_create(
+        [FeeRecord(student_id=student_id, period=period, due_date=period.replace(day=10), status='Unpaid')
+         for student_id, period in wanted],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+    student_ids = sorted({student_id for student_id, _ in wanted})
+    periods = sorted({period for _, period in wanted})
+    records = []
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        chunk = (FeeRecord.objects
+                 .filter(student_id__in=student_ids[start:start + BATCH_SIZE], period__in=periods)
+                 .select_related('student'))
+        records.extend(r for r in chunk if (r.student_id, r.period) in wanted)
+    return refresh_records(records)
+
+
+def generate_month_records(day=None):
+    """Create the FeeRecord of the month containing ``day`` for every active student that lacks one.
+
+    Inserts are batched and skip existing rows, so this is safe to re-run. Returns the number created.
+    """
+    period = month_start(day or date.today())
+    class_fees = get_class_fees()
+    existing = FeeRecord.objects.filter(period=period).values('student_id')
+    students = (Student.objects.filter(is_active=True).exclude(id__in=existing)
+                .only('id', 'manual_fee', 'student_class', 'total_fees'))
+
+    new_ids = set()
+    batch = []
+    for student in students.iterator(chunk_size=BATCH_SIZE * 4):
+        fee = expected_fee(student, class_fees)
+        batch.append(FeeRecord(
+            student_id=student.id, period=period, due_date=period.replace(day=10),
+            expected_amount=fee, pending_amount=fee, status='Unpaid' if fee > 0 else 'Paid',
+        ))
+        new_ids.add(student.id)
+        if len(batch) >= BATCH_SIZE * 4:
+            FeeRecord.objects.bulk_create(batch, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            batch = []
+    if batch:
+        FeeRecord.objects.bulk_create(batch, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    # New records were written as unpaid; count any payments already made that month
+    paying = FeePayment.objects.filter(date__gte=period, date__lt=next_month(period)).values_list('student_id', flat=True)
+    refresh_months((student_id, period) for student_id in set(paying.distinct()) & new_ids)
+    return len(new_ids)
+
+
+def ensure_month_records(day=None):
+    """Run generate_month_records() once per month per cache; cheap to call on every request."""
+    day = day or date.today()
+    key = f"fees:records-generated:{day:%Y-%m}"
+    if cache.get(key):
+        return 0
+    created = generate_month_records(day)
+    cache.set(key, True, 60 * 60 * 24 * 32)
+    return created
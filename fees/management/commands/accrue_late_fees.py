@@ -0,0 +1,37 @@
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fees import late_fees
+
+
+class Command(BaseCommand):
+    help = ("Recompute late fees (GlobalSettings.late_fee_per_day per overdue day) and carried-forward "
+            "arrears for every fee record. Only changed records are written, so it is cheap to run nightly.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', dest='as_of', help="Accrue as of YYYY-MM-DD (default: today).")
+        parser.add_argument('--rate', help="Late fee per day to use instead of GlobalSettings.late_fee_per_day.")
+
+    def handle(self, as_of, rate, **options):
+        if as_of:
+            try:
+                as_of = datetime.strptime(as_of, '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid date '{as_of}' (use YYYY-MM-DD)")
+        if rate is not None:
+            try:
+                rate = Decimal(rate).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise CommandError(f"Invalid rate '{rate}'")
+            if rate < 0:
+                raise CommandError("--rate can't be negative")
+
+        start = time.perf_counter()
+        fees_changed, arrears_changed = late_fees.accrue(as_of, rate)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated the late fee of {fees_changed} and the arrears of {arrears_changed} fee record(s) "
+            f"in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from fees.models import FeePayment, Student
+from fees.stats import compute_fee_stats
+
+
+def _p95(values):
+    return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else (values[0] if values else 0)
+
+
+class Command(BaseCommand):
+    help = ("Measure mixed read/write throughput on SQLite, first with the default rollback journal and then "
+            "with FMS_SQLITE_PRAGMAS (WAL etc.). Runs in a throwaway database; your data is not touched.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help="Threads computing dashboard figures.")
+        parser.add_argument('--writers', type=int, default=2, help="Threads posting payments.")
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--output', help="Also write the results as JSON to this file.")
+
+    def handle(self, readers, writers, seconds, students, output, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark only applies to SQLite.")
+
+        workdir = tempfile.mkdtemp(prefix='fms-sqlite-')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        isolated = override_settings(
+            CACHES={alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+                    for alias in settings.CACHES},
+            FMS_RECEIPT_CACHE_DIR=os.path.join(workdir, 'receipts'),
+        )
+        isolated.enable()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        results = []
+        try:
+            call_command('seed_school', students=students, months=3, interactive=False, stdout=io.StringIO())
+            # A fresh test database starts in rollback-journal mode; the second phase switches it to WAL
+            phases = [('default', {'journal_mode': 'DELETE'}), ('tuned', settings.FMS_SQLITE_PRAGMAS)]
+            for label, pragmas in phases:
+                with override_settings(FMS_SQLITE_TUNING=True, FMS_SQLITE_PRAGMAS=pragmas):
+                    connections.close_all()
+                    results.append(self.run_phase(label, readers, writers, seconds))
+                    connections.close_all()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            isolated.disable()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        self.stdout.write(f"{'profile':<9} {'reads/s':>9} {'writes/s':>9} {'read p95':>10} {'write p95':>10} {'locked':>7}")
+        for r in results:
+            self.stdout.write(f"{r['profile']:<9} {r['reads_per_s']:>9.1f} {r['writes_per_s']:>9.1f} "
+                              f"{r['read_p95_ms']:>8.1f}ms {r['write_p95_ms']:>8.1f}ms {r['locked_errors']:>7}")
+        if output:
+            with open(output, 'w') as f:
+                json.dump({'readers': readers, 'writers': writers, 'seconds': seconds, 'students': students,
+                           'results': results}, f, indent=2)
+
+    def run_phase(self, label, readers, writers, seconds):
+        student_ids = list(Student.objects.filter(is_active=True).values_list('pk', flat=True))
+        latencies = {'read': [], 'write': []}
+        errors = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def work(kind, seed):
+            rng = random.Random(seed)
+            try:
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        if kind == 'read':
+                            compute_fee_stats()
+                        else:
+                            # Goes through the payment signals, i.e. the same ledger writes as a cashier's save
+                            FeePayment.objects.create(student_id=rng.choice(student_ids), amount=Decimal('10.00'),
+                                                      payment_mode='Cash', date=date.today())
+                    except OperationalError:
+                        with lock:
+                            errors.append(kind)
+                        continue
+                    with lock:
+                        latencies[kind].append((time.perf_counter() - start) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=('read', i)) for i in range(readers)]
+        threads += [threading.Thread(target=work, args=('write', readers + i)) for i in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        journal = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+        return {
+            'profile': label,
+            'journal_mode': journal,
+            'reads_per_s': len(latencies['read']) / seconds,
+            'writes_per_s': len(latencies['write']) / seconds,
+            'read_p95_ms': _p95(latencies['read']),
+            'write_p95_ms': _p95(latencies['write']),
+            'locked_errors': len(errors),
+        }
@@ -0,0 +1,148 @@
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from fees.models import CustomUser, FeePayment
+
+MODELS = ['student', 'classfee', 'feepayment', 'feerecord', 'customuser', 'group']
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _consume(response):
+    # Streaming/file responses only do their work when read
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+class Command(BaseCommand):
+    help = ("Time the main views against seeded synthetic schools of several sizes and write a JSON report. "
+            "Runs in a throwaway database; your data is not touched.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help="Comma-separated student counts.")
+        parser.add_argument('--months', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=5, help="Timed requests per view (after one warm-up).")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Keep the cache between requests instead of clearing it before each one.")
+        parser.add_argument('--output', default='benchmark_report.json')
+
+    def handle(self, sizes, months, repeat, warm_cache, output, **options):
+        sizes = [int(s) for s in sizes.split(',') if s.strip()]
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'warm_cache': warm_cache,
+            'results': [],
+        }
+
+        # Benchmark against an on-disk copy of the schema so I/O is realistic, with caches of its own
+        # so clearing it between requests leaves the real one alone
+        workdir = tempfile.mkdtemp(prefix='fms-bench-')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        bench_cache = override_settings(CACHES={
+            alias: {**config, 'LOCATION': os.path.join(workdir, 'cache', alias)}
+            for alias, config in settings.CACHES.items()
+        }, FMS_RECEIPT_CACHE_DIR=os.path.join(workdir, 'receipts'))
+        bench_cache.enable()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            for size in sizes:
+                self.stdout.write(f"Seeding {size} students...")
+                cache.clear()
+                call_command('seed_school', students=size, months=months, flush=True, interactive=False,
+                             stdout=io.StringIO())
+                report['results'].extend(self.run_size(size, repeat, warm_cache))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            cache.clear()
+            bench_cache.disable()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} measurements to {output}"))
+
+    def clear_caches(self):
+        cache.clear()
+        shutil.rmtree(settings.FMS_RECEIPT_CACHE_DIR, ignore_errors=True)
+
+    def run_size(self, size, repeat, warm_cache):
+        admin, _ = CustomUser.objects.get_or_create(username='benchmark', defaults={'is_superuser': True, 'is_staff': True})
+        client = Client()
+        client.force_login(admin)
+        payment = FeePayment.objects.order_by('pk').first()
+
+        views = [('dashboard', reverse('fees:dashboard'))]
+        views += [(name, reverse(f'fees:{name}')) for name in ('dashboard_kpis', 'dashboard_revenue', 'dashboard_recent_payments')]
+        views += [(f'manage_list:{m}', reverse('fees:manage_list', args=[m])) for m in MODELS]
+        views += [
+            ('monthly_fees', reverse('fees:monthly_fees')),
+            ('monthly_fees:csv', reverse('fees:monthly_fees') + '?export=csv'),
+            ('paid_students_list', reverse('fees:paid_students_list')),
+            ('unpaid_students_list', reverse('fees:unpaid_students_list')),
+            ('generate_receipt', reverse('fees:generate_receipt', args=[payment.pk])),
+            ('export_fees_excel', reverse('fees:export_fees_excel')),
+        ]
+
+        results = []
+        for name, url in views:
+            _consume(client.get(url))
+            timings, queries = [], []
+            for _ in range(repeat):
+                if not warm_cache:
+                    self.clear_caches()
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    _consume(response)
+                    timings.append(time.perf_counter() - start)
+                queries.append(len(ctx))
+
+            # tracemalloc slows allocation-heavy code a lot, so memory gets its own untimed request
+            if not warm_cache:
+                self.clear_caches()
+            tracemalloc.start()
+            _consume(client.get(url))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({
+                'students': size,
+                'view': name,
+                'status': response.status_code,
+                'wall_ms_median': round(statistics.median(timings) * 1000, 2),
+                'wall_ms_min': round(min(timings) * 1000, 2),
+                'queries': max(queries),
+                'peak_memory_kb': round(peak / 1024, 1),
+            })
+            self.stdout.write(f"  {size:>7} {name:<28} {results[-1]['wall_ms_median']:>9.1f} ms "
+                              f"{results[-1]['queries']:>5} queries {results[-1]['peak_memory_kb']:>9.1f} KB")
+        return results
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fees import ledger
+from fees.stats import invalidate_fee_stats
+from fees.utils.reports_monthly import parse_month_param
+
+
+class Command(BaseCommand):
+    help = ("Create the month's FeeRecord for every active student that doesn't have one yet. "
+            "Safe to re-run; schedule it (e.g. cron) on the 1st of each month.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Billing month as YYYY-MM (default: current month).")
+
+    def handle(self, month, **options):
+        day = date.today()
+        if month:
+            day = parse_month_param(month)
+            if day is None:
+                raise CommandError("--month must look like YYYY-MM")
+        created = ledger.generate_month_records(day)
+        invalidate_fee_stats()
+        self.stdout.write(self.style.SUCCESS(f"Created {created} fee record(s) for {day:%B %Y}."))
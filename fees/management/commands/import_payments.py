@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fees.utils.payment_import import BATCH_SIZE, import_payments, read_rows, validate_rows
+
+
+class Command(BaseCommand):
+    help = "Import fee payments from a CSV or XLSX file (columns: roll_no, amount, payment_mode, date)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, don't save anything.")
+
+    def handle(self, path, batch_size, dry_run, **options):
+        try:
+            with open(path, 'rb') as f:
+                payments, errors = validate_rows(read_rows(f, path))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in errors:
+            self.stderr.write(f"Line {line}: {message}")
+        if errors:
+            raise CommandError(f"{len(errors)} invalid row(s); nothing was imported.")
+
+        if dry_run:
+            self.stdout.write(f"{len(payments)} payment(s) are valid.")
+            return
+        refreshed = import_payments(payments, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(payments)} payment(s); updated {refreshed} fee record(s)."))
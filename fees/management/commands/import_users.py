@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fees.utils.payment_import import read_rows
+from fees.utils.user_import import BATCH_SIZE, REQUIRED_COLUMNS, import_users, validate_rows
+
+
+class Command(BaseCommand):
+    help = ("Create user accounts from a CSV or XLSX file. Columns: username, password and optionally email, "
+            "first_name, last_name, is_staff, security_question, security_answer, groups and permissions "
+            "(';'-separated group names / app_label.codename). Missing groups are created.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--workers', type=int, help="Worker processes for password hashing (default: CPU count).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, don't save anything.")
+
+    def handle(self, path, workers, batch_size, dry_run, **options):
+        try:
+            with open(path, 'rb') as f:
+                entries, errors = validate_rows(read_rows(f, path, required=REQUIRED_COLUMNS))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in errors:
+            self.stderr.write(f"Line {line}: {message}")
+        if errors:
+            raise CommandError(f"{len(errors)} invalid row(s); nothing was imported.")
+
+        if dry_run:
+            self.stdout.write(f"{len(entries)} user(s) are valid.")
+            return
+        start = time.perf_counter()
+        users, groups = import_users(entries, workers=workers, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {users} user(s) and created {groups} group(s) in {time.perf_counter() - start:.1f}s."
+        ))
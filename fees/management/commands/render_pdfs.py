@@ -0,0 +1,43 @@
+import shutil
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fees.utils.pdf_batch import batch_documents, default_range, render_merged, render_zip
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}' (use YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = ("Render receipts (payments in a date range) or statements of account (active students over "
+            "the months in a date range) to a ZIP of PDFs, or one merged PDF with --merge.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['receipts', 'statements'])
+        parser.add_argument('--from', dest='start', help="YYYY-MM-DD (default: start of this month; of the last 12 months for statements).")
+        parser.add_argument('--to', dest='end', help="YYYY-MM-DD (default: today).")
+        parser.add_argument('--class', dest='student_class')
+        parser.add_argument('--merge', action='store_true', help="Write one multi-page PDF instead of a ZIP.")
+        parser.add_argument('--workers', type=int, help="Worker processes for ZIP output (default: CPU count).")
+        parser.add_argument('--output', '-o', help="Output file (default: <kind>.zip or <kind>.pdf).")
+
+    def handle(self, kind, start, end, student_class, merge, workers, output, **options):
+        default_start, default_end = default_range(kind)
+        end = _parse_date(end) if end else default_end
+        start = _parse_date(start) if start else default_start
+        if start > end:
+            raise CommandError("--from must not be after --to")
+
+        documents = batch_documents(kind, start, end, student_class)
+        if not documents:
+            raise CommandError(f"No {kind} match that selection.")
+        output = output or f"{kind}.{'pdf' if merge else 'zip'}"
+        result = render_merged(documents) if merge else render_zip(documents, workers)
+        with open(output, 'wb') as f:
+            shutil.copyfileobj(result, f)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(documents)} {kind} to {output}."))
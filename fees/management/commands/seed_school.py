@@ -0,0 +1,103 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from fees import ledger
+from fees.class_fees import get_class_fees, invalidate_class_fees
+from fees.models import ClassFee, FeePayment, FeeRecord, Student
+from fees.stats import invalidate_fee_stats
+from fees.utils.reports_monthly import last_months
+
+FIRST_NAMES = ['Ali', 'Sara', 'Ahmed', 'Fatima', 'Usman', 'Ayesha', 'Bilal', 'Zainab', 'Hamza', 'Maryam',
+               'Omar', 'Hira', 'Hassan', 'Amna', 'Saad', 'Noor', 'Imran', 'Sana', 'Farhan', 'Iqra']
+LAST_NAMES = ['Khan', 'Ahmed', 'Malik', 'Hussain', 'Sheikh', 'Qureshi', 'Butt', 'Chaudhry', 'Raza', 'Iqbal']
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Seed a reproducible synthetic school: classes, students, payment history and fee records."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--classes', type=int, default=10)
+        parser.add_argument('--months', type=int, default=12, help="Months of history, ending with the current one.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--flush', action='store_true',
+                            help="Delete existing students, class fees, payments and fee records first.")
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive')
+
+    def handle(self, students, classes, months, seed, flush, interactive, **options):
+        if flush:
+            if interactive and input("This deletes ALL students, class fees, payments and fee records. "
+                                     "Type 'yes' to continue: ") != 'yes':
+                raise CommandError("Seeding cancelled.")
+        elif Student.objects.exists():
+            raise CommandError("The database already has students; use --flush to replace them.")
+
+        rng = random.Random(seed)
+        periods = [date(m['year'], m['month'], 1) for m in last_months(months)]
+        # Payment days stay in the past for the current month
+        last_day = {period: 28 for period in periods}
+        last_day[periods[-1]] = min(28, date.today().day)
+        with transaction.atomic():
+            if flush:
+                # Deleting students cascades to their payments and records without per-payment ledger syncs
+                Student.objects.all().delete()
+                ClassFee.objects.all().delete()
+
+            class_names = [str(i) for i in range(1, classes + 1)]
+            ClassFee.objects.bulk_create([
+                ClassFee(student_class=name, fee_amount=Decimal(1000 + 250 * i)) for i, name in enumerate(class_names)
+            ])
+            invalidate_class_fees()
+
+            Student.objects.bulk_create([
+                Student(
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    father_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    roll_no=roll_no,
+                    student_class=rng.choice(class_names),
+                    total_fees=Decimal(1500),
+                    # A few students get a discounted manual fee, a few have left
+                    manual_fee=Decimal(800) if rng.random() < 0.05 else None,
+                    phone_number=f"03{rng.randrange(10 ** 9):09d}",
+                    is_active=rng.random() >= 0.03,
+                )
+                for roll_no in range(1, students + 1)
+            ], batch_size=BATCH_SIZE)
+
+            fees = get_class_fees()
+            payments = []
+            for student in Student.objects.filter(is_active=True).iterator(chunk_size=BATCH_SIZE):
+                fee = ledger.expected_fee(student, fees)
+                for period in periods:
+                    roll = rng.random()
+                    if roll < 0.75:
+                        amounts = [fee]
+                    elif roll < 0.9:
+                        # Paid in two instalments, second one possibly short
+                        half = (fee / 2).quantize(Decimal('0.01'))
+                        amounts = [half, half if rng.random() < 0.5 else (half / 2).quantize(Decimal('0.01'))]
+                    else:
+                        amounts = []
+                    for amount in amounts:
+                        payments.append(FeePayment(
+                            student=student, amount=amount, payment_mode=rng.choice(['Cash', 'Online']),
+                            date=period.replace(day=rng.randint(1, last_day[period])),
+                        ))
+                if len(payments) >= BATCH_SIZE:
+                    FeePayment.objects.bulk_create(payments)
+                    payments = []
+            FeePayment.objects.bulk_create(payments)
+
+            for period in periods:
+                ledger.generate_month_records(period)
+        invalidate_fee_stats()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {students} students in {classes} classes with {FeePayment.objects.count()} payments "
+            f"and {FeeRecord.objects.count()} fee records over {months} months."
+        ))
@@ -0,0 +1,119 @@
+import math
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Requests kept per view; the summary is per process, so each worker reports its own traffic
+WINDOW = getattr(settings, 'FMS_METRICS_WINDOW', 200)
+TOP_SHAPES = 3
+
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_lock = threading.Lock()
+
+# The current request's QueryRecorder. A context variable rather than a wrapper on one connection:
+# under ASGI the request's queries run on sync_to_async threads with their own connections, and
+# asgiref carries the context into those threads.
+_recorder = ContextVar('fees_query_recorder', default=None)
+
+_IN_LIST = re.compile(r'IN \(%s(?:, %s)*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+def query_shape(sql):
+    """SQL with literals and IN-list lengths folded, so the same query from a loop groups together."""
+    return _NUMBER.sub('N', _IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() hook counting queries and their time, grouped by shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.shapes = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.time += elapsed
+            shape = self.shapes[query_shape(sql)]
+            shape[0] += 1
+            shape[1] += elapsed
+
+    def repeated(self, limit=TOP_SHAPES):
+        """The slowest shapes run more than once, as (sql, count, ms) - the usual sign of an N+1."""
+        shapes = [(sql, count, elapsed * 1000) for sql, (count, elapsed) in self.shapes.items() if count > 1]
+        return sorted(shapes, key=lambda s: s[2], reverse=True)[:limit]
+
+
+def _execute(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    """Route a connection's queries to the current request's recorder (a connection_created receiver)."""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@contextmanager
+def recording(recorder):
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def record(view, total_ms, queries, sql_ms, repeated):
+    with _lock:
+        _samples[view].append({'total': total_ms, 'queries': queries, 'sql': sql_ms, 'repeated': repeated})
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def _percentile(values, pct):
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summary():
+    """Per-view latency and query figures over the rolling window, slowest p95 first."""
+    with _lock:
+        snapshot = {view: list(samples) for view, samples in _samples.items()}
+
+    rows = []
+    for view, samples in snapshot.items():
+        totals = sorted(s['total'] for s in samples)
+        queries = sorted(s['queries'] for s in samples)
+        shapes = {}
+        for s in samples:
+            for sql, count, elapsed in s['repeated']:
+                worst = shapes.get(sql)
+                if worst is None or elapsed > worst['ms']:
+                    shapes[sql] = {'sql': sql, 'count': count, 'ms': elapsed}
+        rows.append({
+            'view': view,
+            'requests': len(samples),
+            'p50': _percentile(totals, 50),
+            'p95': _percentile(totals, 95),
+            'queries_p50': _percentile(queries, 50),
+            'queries_max': queries[-1],
+            'sql_avg': sum(s['sql'] for s in samples) / len(samples),
+            'repeated': sorted(shapes.values(), key=lambda s: s['ms'], reverse=True)[:TOP_SHAPES],
+        })
+    return sorted(rows, key=lambda r: r['p95'], reverse=True)
@@ -0,0 +1,169 @@
+import cProfile
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics, profiling
+
+
+class RequestMetricsMiddleware:
+    """Time each request and its SQL, report it in a Server-Timing header and feed fees.metrics.
+
+    Enabled with FMS_REQUEST_METRICS; when off Django drops it from the chain at startup.
+    Streamed bodies (CSV exports) are produced after this returns, so their time isn't included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'FMS_REQUEST_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Every connection, including ones opened later on other threads, reports to the
+        # recorder of whichever request is using it
+        connection_created.connect(metrics.install, dispatch_uid='fees.metrics.install')
+        for connection in connections.all(initialized_only=True):
+            metrics.install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with metrics.recording(metrics.QueryRecorder()) as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with metrics.recording(metrics.QueryRecorder()) as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder, start)
+
+    def report(self, request, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        sql_ms = recorder.time * 1000
+        repeated = recorder.repeated()
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.record(match.view_name if match else 'unresolved', total_ms, recorder.count, sql_ms, repeated)
+
+        timings = [f'total;dur={total_ms:.1f}', f'sql;dur={sql_ms:.1f};desc="{recorder.count} queries"']
+        if repeated:
+            runs = sum(count for _, count, _ in repeated)
+            timings.append(f'sql-repeated;dur={sum(ms for _, _, ms in repeated):.1f};'
+                           f'desc="{len(repeated)} shapes, {runs} queries"')
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+class ProfilingMiddleware:
+    """cProfile a single request for a superuser who asks with ?_profile=1 or an X-Profile header.
+
+    Enabled with FMS_PROFILING; when off Django drops it from the chain at startup. Must come
+    after AuthenticationMiddleware. Profiles are saved to FMS_PROFILE_DIR and listed at /profiles/.
+    Under ASGI the profiler sees the event loop thread only: async views and middleware, but not
+    sync code run on sync_to_async threads, and any other request the loop serves meanwhile.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'FMS_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def wanted(request):
+        return '_profile' in request.GET or 'X-Profile' in request.headers
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not (self.wanted(request) and request.user.is_superuser):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        return self.save(request, response, profiler, start)
+
+    async def __acall__(self, request):
+        if not self.wanted(request):
+            return await self.get_response(request)
+        # request.auser() is Django 5.0+; request.user would query from the event loop
+        if hasattr(request, 'auser'):
+            is_superuser = (await request.auser()).is_superuser
+        else:
+            is_superuser = await sync_to_async(lambda: request.user.is_superuser)()
+        if not is_superuser:
+            return await self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        return self.save(request, response, profiler, start)
+
+    def save(self, request, response, profiler, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        match = getattr(request, 'resolver_match', None)
+        response['X-Profile-Id'] = profiling.save_profile(profiler, match.view_name if match else request.path, total_ms)
+        return response
+
+
+class SessionRefreshMiddleware:
+    """Sliding session expiry without a session write on every request.
+
+    With SESSION_SAVE_EVERY_REQUEST off, Django only saves a session whose data changed. This
+    also re-saves an unchanged one (renewing its expiry and cookie) once it is older than
+    SESSION_REFRESH_INTERVAL, so an active user is signed out after between
+    SESSION_COOKIE_AGE - SESSION_REFRESH_INTERVAL and SESSION_COOKIE_AGE of inactivity.
+    Must come after SessionMiddleware.
+    """
+
+    KEY = '_refreshed_at'
+    # Runs natively under ASGI too, so async views aren't pushed onto a thread by this middleware
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.refresh(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.refresh(request, await self.get_response(request))
+
+    def refresh(self, request, response):
+        session = getattr(request, 'session', None)
+        # Untouched (e.g. anonymous) sessions aren't loaded just to check them, so this never
+        # queries and is safe to call from the event loop
+        if session is None or not session.accessed or session.is_empty():
+            return response
+        now = int(time.time())
+        # A session being saved anyway (login, changed data) gets stamped for free
+        if session.modified or now - session.get(self.KEY, 0) >= settings.SESSION_REFRESH_INTERVAL:
+            session[self.KEY] = now
+        return response
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+def backfill_ledger(apps, schema_editor):
+    from datetime import datetime
+    from decimal import Decimal
+    from django.db.models import Sum
+    ClassFee = apps.get_model('fees', 'ClassFee')
+    FeePayment = apps.get_model('fees', 'FeePayment')
+    FeeRecord = apps.get_model('fees', 'FeeRecord')
+    class_fees = dict(ClassFee.objects.values_list('student_class', 'fee_amount'))
+    records = list(FeeRecord.objects.select_related('student'))
+    for record in records:
+        student = record.student
+        if student.manual_fee is not None:
+            record.expected_amount = student.manual_fee
+        else:
+            record.expected_amount = class_fees.get(student.student_class, student.total_fees)
+        try:
+            md = datetime.strptime(record.month, "%B %Y")
+            record.paid_amount = FeePayment.objects.filter(
+                student=student, date__year=md.year, date__month=md.month
+            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        except ValueError:
+            record.paid_amount = Decimal('0')
+        record.pending_amount = max(Decimal('0'), record.expected_amount - record.paid_amount)
+    FeeRecord.objects.bulk_update(records, ['expected_amount', 'paid_amount', 'pending_amount'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0004_student_manual_fee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feerecord',
+            name='expected_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='feerecord',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='feerecord',
+            name='pending_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0005_feerecord_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feepayment',
+            name='date',
+            field=models.DateField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='student_class',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, models
+
+
+def fill_period(apps, schema_editor):
+    from datetime import datetime
+    FeeRecord = apps.get_model('fees', 'FeeRecord')
+    records = list(FeeRecord.objects.all())
+    for record in records:
+        try:
+            record.period = datetime.strptime(record.month, "%B %Y").date()
+        except (TypeError, ValueError):
+            # Unparseable label: fall back to the month the record is due in
+            record.period = record.due_date.replace(day=1)
+    FeeRecord.objects.bulk_update(records, ['period'], batch_size=500)
+
+
+def fill_month(apps, schema_editor):
+    FeeRecord = apps.get_model('fees', 'FeeRecord')
+    records = list(FeeRecord.objects.all())
+    for record in records:
+        record.month = record.period.strftime("%B %Y")
+    FeeRecord.objects.bulk_update(records, ['month'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0006_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feerecord',
+            name='period',
+            field=models.DateField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='feerecord',
+            name='month',
+            field=models.CharField(max_length=32, null=True),
+        ),
+        migrations.RunPython(fill_period, fill_month),
+        migrations.AlterField(
+            model_name='feerecord',
+            name='period',
+            field=models.DateField(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='feerecord',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='feerecord',
+            name='month',
+        ),
+        migrations.AddConstraint(
+            model_name='feerecord',
+            constraint=models.UniqueConstraint(fields=('student', 'period'), name='fees_feerecord_student_period'),
+        ),
+        migrations.AddIndex(
+            model_name='feerecord',
+            index=models.Index(fields=['period', 'status'], name='fees_feerec_period_status'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import OperationalError, migrations
+
+# SQLite FTS5 index over the searchable Student columns, reading them from fees_student
+# (external content); triggers keep it in step with every write. The SQL is frozen here as of
+# this migration: fees.search only repairs it at runtime.
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS fees_student_search USING fts5("
+    "name, father_name, roll_no, phone_number, content='fees_student', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS fees_student_search_ai AFTER INSERT ON fees_student BEGIN "
+    "INSERT INTO fees_student_search(rowid, name, father_name, roll_no, phone_number) "
+    "VALUES (new.id, new.name, new.father_name, new.roll_no, new.phone_number); END",
+    "CREATE TRIGGER IF NOT EXISTS fees_student_search_ad AFTER DELETE ON fees_student BEGIN "
+    "INSERT INTO fees_student_search(fees_student_search, rowid, name, father_name, roll_no, phone_number) "
+    "VALUES ('delete', old.id, old.name, old.father_name, old.roll_no, old.phone_number); END",
+    "CREATE TRIGGER IF NOT EXISTS fees_student_search_au AFTER UPDATE ON fees_student BEGIN "
+    "INSERT INTO fees_student_search(fees_student_search, rowid, name, father_name, roll_no, phone_number) "
+    "VALUES ('delete', old.id, old.name, old.father_name, old.roll_no, old.phone_number); "
+    "INSERT INTO fees_student_search(rowid, name, father_name, roll_no, phone_number) "
+    "VALUES (new.id, new.name, new.father_name, new.roll_no, new.phone_number); END",
+    "INSERT INTO fees_student_search(fees_student_search) VALUES ('rebuild')",
+]
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS fees_student_search_ai",
+    "DROP TRIGGER IF EXISTS fees_student_search_ad",
+    "DROP TRIGGER IF EXISTS fees_student_search_au",
+    "DROP TABLE IF EXISTS fees_student_search",
+]
+
+
+class SQLiteFTS5RunSQL(migrations.RunSQL):
+    """RunSQL that is a no-op on other databases and on SQLite builds without FTS5, where
+    searches fall back to plain lookups."""
+
+    def _fts5_available(self, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return False
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute("CREATE VIRTUAL TABLE temp.fees_fts5_probe USING fts5(probe)")
+            except OperationalError:
+                return False
+            cursor.execute("DROP TABLE temp.fees_fts5_probe")
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self._fts5_available(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0007_feerecord_period'),
+    ]
+
+    operations = [
+        SQLiteFTS5RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0009_feerecord_late_fee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('taken_at', models.DateTimeField()),
+                ('students_recomputed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='feerecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='StudentAging',
+            fields=[
+                ('days_0_30', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_31_60', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_61_90', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_over_90', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='aging', serialize=False, to='fees.student')),
+                ('as_of', models.DateField()),
+                ('stale', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total'], name='fees_studentaging_total')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassAging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days_0_30', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_31_60', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_61_90', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('days_over_90', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('student_class', models.CharField(max_length=64)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classes', to='fees.agingsnapshot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'student_class'), name='fees_classaging_snapshot_class')],
+            },
+        ),
+    ]
@@ -1,10 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
-from django.db.models import Sum
-from datetime import datetime
 import bcrypt
 
+from .utils.credentials import hash_security_answer, normalize_answer
+
 
 SECURITY_QUESTIONS = [
     ('mother_name', "What is your mother's name?"),
@@ -38,17 +38,13 @@ class CustomUser(AbstractUser):
         if not raw_answer:
             self.security_answer = None
             return
-        # Ensure answer is treated as string & lowercased for better UX (optional but common)
-        raw_answer = str(raw_answer).strip().lower()
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(raw_answer.encode('utf-8'), salt)
-        self.security_answer = hashed.decode('utf-8')
+        self.security_answer = hash_security_answer(raw_answer)
 
     def check_security_answer(self, raw_answer: str) -> bool:
         if not self.security_answer or not raw_answer:
             return False
         
-        raw_answer = str(raw_answer).strip().lower()
+        raw_answer = normalize_answer(raw_answer)
         
         # Check if it looks like a bcrypt hash (starts with $2b$)
         if self.security_answer.startswith('$2b$'):
@@ -62,9 +58,9 @@ class CustomUser(AbstractUser):
 
 
 class Student(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     roll_no = models.IntegerField(unique=True)
-    student_class = models.CharField(max_length=64)
+    student_class = models.CharField(max_length=64, db_index=True)
     total_fees = models.DecimalField(max_digits=10, decimal_places=2)
     manual_fee = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     father_name = models.CharField(max_length=255, blank=True, null=True)
@@ -79,13 +75,10 @@ class Student(models.Model):
 
     def get_total_fee(self):
         """Return manual_fee if set, else the class fee amount or the student's total_fees."""
+        from .class_fees import get_class_fees
         if self.manual_fee is not None:
             return float(self.manual_fee)
-        try:
-            cf = ClassFee.objects.get(student_class=self.student_class)
-            return float(cf.fee_amount)
-        except ClassFee.DoesNotExist:
-            return float(self.total_fees)
+        return float(get_class_fees().get(self.student_class, self.total_fees))
 
 
 class ClassFee(models.Model):
@@ -100,31 +93,33 @@ class FeeRecord(models.Model):
     STATUS_CHOICES = [('Paid', 'Paid'), ('Unpaid', 'Unpaid')]
 
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    month = models.CharField(max_length=32)
+    # First day of the billing month
+    period = models.DateField()
     due_date = models.DateField()
     submission_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Unpaid')
+    # Ledger columns, kept current by fees.ledger from the payment/fee signals
+    expected_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    pending_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    # Written by fees.late_fees (accrue_late_fees command), not by the payment signals
+    late_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    arrears = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    # Lets fees.aging find the records changed since its last snapshot
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
-        unique_together = ('student', 'month')
-
-    @property
-    def paid_amount(self):
-        try:
-            from .models import FeePayment
-            md = datetime.strptime(self.month, "%B %Y")
-            # Sum all payments for this student in this specific month/year
-            return float(FeePayment.objects.filter(
-                student=self.student, 
-                date__year=md.year, 
-                date__month=md.month
-            ).aggregate(total=Sum('amount'))['total'] or 0)
-        except Exception as e:
-            return 0.0
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'period'], name='fees_feerecord_student_period'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'status'], name='fees_feerec_period_status'),
+        ]
 
     @property
-    def pending_amount(self):
-        return max(0.0, float(self.student.get_total_fee()) - self.paid_amount)
+    def month(self):
+        """Billing month label, e.g. "March 2026"."""
+        return self.period.strftime("%B %Y")
 
     def __str__(self):
         return f"{self.student} - {self.month} - {self.status}"
@@ -136,7 +131,7 @@ class FeePayment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_mode = models.CharField(max_length=10, choices=PAYMENT_CHOICES)
-    date = models.DateField(default=timezone.now)
+    date = models.DateField(default=timezone.now, db_index=True)
 
     def __str__(self):
         return f"{self.student} - {self.amount} on {self.date}"
@@ -151,3 +146,50 @@ class GlobalSettings(models.Model):
 
     class Meta:
         verbose_name_plural = "Global Settings"
+
+
+class AgingBalances(models.Model):
+    """Outstanding (pending) fee balances split by days past due_date."""
+    days_0_30 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_31_60 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_61_90 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_over_90 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class AgingSnapshot(models.Model):
+    """One daily run of fees.aging; balances are aged relative to ``date``."""
+    date = models.DateField(unique=True)
+    taken_at = models.DateTimeField()
+    students_recomputed = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Aging snapshot {self.date}"
+
+
+class StudentAging(AgingBalances):
+    """A student's aged balance as of the last snapshot that recomputed it. Only students who owe have a row."""
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='aging')
+    as_of = models.DateField()
+    # Set when one of the student's fee records is deleted, so the next snapshot recomputes it
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-total'], name='fees_studentaging_total'),
+        ]
+
+
+class ClassAging(AgingBalances):
+    """Per-class totals of a snapshot, kept for every day so the report can chart trends."""
+    snapshot = models.ForeignKey(AgingSnapshot, on_delete=models.CASCADE, related_name='classes')
+    student_class = models.CharField(max_length=64)
+    students = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot', 'student_class'], name='fees_classaging_snapshot_class'),
+        ]
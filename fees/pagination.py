@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+PAGE_SIZE = 50
+COUNT_TIMEOUT = 60
+COUNT_VERSION_KEY = 'fees:count-version:{label}'
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value, pk], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token):
+    """Return [value, pk] from a cursor token, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(value, list) or len(value) != 2:
+        return None
+    return value
+
+
+def _order_field(model, path):
+    # Model field behind an order_field path such as 'student__name'
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def _clean_cursor(queryset, order_field, cursor):
+    # Tokens come from the query string; a tampered value would make the filter raise
+    if cursor is None:
+        return None
+    try:
+        value = _order_field(queryset.model, order_field).to_python(cursor[0])
+        pk = queryset.model._meta.pk.to_python(cursor[1])
+    except (ValidationError, TypeError, ValueError):
+        return None
+    if value is None or pk is None:
+        return None
+    return value, pk
+
+
+def keyset_page(queryset, order_field, descending=False, after=None, before=None, page_size=PAGE_SIZE):
+    """Fetch one page of ``queryset`` ordered by (order_field, pk) without OFFSET.
+
+    ``after``/``before`` are cursor tokens from a previous page; an invalid one is ignored.
+    Returns (rows, next_cursor, prev_cursor); a cursor is None when there is no such page.
+    """
+    forward = not before
+    cursor = _clean_cursor(queryset, order_field, decode_cursor(after if forward else before))
+    query_desc = descending if forward else not descending
+    sign = '-' if query_desc else ''
+
+    qs = queryset.annotate(keyset_value=F(order_field))
+    if cursor:
+        value, pk = cursor
+        if query_desc:
+            qs = qs.filter(Q(keyset_value__lt=value) | Q(keyset_value=value, pk__lt=pk))
+        else:
+            qs = qs.filter(Q(keyset_value__gt=value) | Q(keyset_value=value, pk__gt=pk))
+    rows = list(qs.order_by(f'{sign}keyset_value', f'{sign}pk')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if not forward:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more if forward else cursor:
+            next_cursor = encode_cursor(rows[-1].keyset_value, rows[-1].pk)
+        if cursor if forward else has_more:
+            prev_cursor = encode_cursor(rows[0].keyset_value, rows[0].pk)
+    return rows, next_cursor, prev_cursor
+
+
+def cached_count(queryset):
+    """queryset.count(), cached per model and query until invalidate_count() or COUNT_TIMEOUT."""
+    label = queryset.model._meta.label_lower
+    version = cache.get(COUNT_VERSION_KEY.format(label=label), 0)
+    digest = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = f'fees:count:{label}:{version}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_count(model):
+    key = COUNT_VERSION_KEY.format(label=model._meta.label_lower)
+    cache.set(key, cache.get(key, 0) + 1, None)
@@ -0,0 +1,64 @@
+import os
+import pstats
+import re
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+TOP_FUNCTIONS = 40
+KEEP = getattr(settings, 'FMS_PROFILE_KEEP', 50)
+
+_NAME = re.compile(r'^[\w.-]+\.prof$')
+
+
+def profile_dir():
+    return Path(settings.FMS_PROFILE_DIR)
+
+
+def save_profile(profiler, label, total_ms):
+    """Dump a finished cProfile.Profile and prune the oldest files beyond KEEP. Returns the file name."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^\w-]+', '-', label).strip('-')[:60] or 'request'
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}-{total_ms:.0f}ms.prof"
+    profiler.dump_stats(directory / name)
+    for old in list_profiles()[KEEP:]:
+        os.remove(old['path'])
+    return name
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.glob('*.prof'):
+        stat = path.stat()
+        profiles.append({'name': path.name, 'path': path, 'size': stat.st_size, 'created': stat.st_mtime})
+    return sorted(profiles, key=lambda p: p['created'], reverse=True)
+
+
+def profile_path(name):
+    """Path of a saved profile, or None for names that aren't one (including traversal attempts)."""
+    if not _NAME.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def top_functions(path, limit=TOP_FUNCTIONS):
+    """(total seconds, rows) for the functions with the highest cumulative time in a profile."""
+    stats = pstats.Stats(str(path))
+    rows = []
+    for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': func,
+            'location': f'{filename}:{line}' if line else filename,
+            'calls': calls,
+            'own': own * 1000,
+            'cumulative': cumulative * 1000,
+        })
+    rows.sort(key=lambda r: r['cumulative'], reverse=True)
+    return stats.total_tt, rows[:limit]
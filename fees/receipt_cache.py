@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .utils.reports_pdf import receipt_data, render_pdf
+
+# Bump when the receipt layout changes so files rendered with the old one stop matching
+LAYOUT_VERSION = 1
+
+
+def cache_dir():
+    return Path(settings.FMS_RECEIPT_CACHE_DIR)
+
+
+def fingerprint(data):
+    """sha256 of everything printed on the receipt; doubles as its ETag."""
+    raw = json.dumps([LAYOUT_VERSION, data], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_receipt(payment):
+    """(path, fingerprint) of the payment's rendered receipt, rendering it only on a miss.
+
+    Files live at <dir>/<payment id>/<fingerprint>.pdf, so an edit that changes what the
+    receipt shows can never be served stale, even if invalidate() was missed.
+    """
+    data = receipt_data(payment)
+    digest = fingerprint(data)
+    folder = cache_dir() / str(payment.pk)
+    path = folder / f'{digest}.pdf'
+    if not path.exists():
+        folder.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent request never reads a half-written file
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(render_pdf([data]).getvalue())
+        os.replace(tmp, path)
+        for old in folder.glob('*.pdf'):
+            if old != path:
+                old.unlink(missing_ok=True)
+    return path, digest
+
+
+def invalidate(*payment_ids):
+    for pk in payment_ids:
+        shutil.rmtree(cache_dir() / str(pk), ignore_errors=True)
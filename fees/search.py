@@ -0,0 +1,120 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Student
+
+# SQLite FTS5 index over the searchable Student columns. It reads the columns from
+# fees_student itself (external content) and SQL triggers keep it in step with every write,
+# including bulk_create()/update() that skip model signals.
+SEARCH_TABLE = 'fees_student_search'
+COLUMNS = ['name', 'father_name', 'roll_no', 'phone_number']
+TYPEAHEAD_LIMIT = 10
+
+_TOKEN = re.compile(r'\w+')
+_state = {'ready': False}
+
+
+def _trigger_sql():
+    cols = ', '.join(COLUMNS)
+    new = ', '.join(f'new.{c}' for c in COLUMNS)
+    old = ', '.join(f'old.{c}' for c in COLUMNS)
+    delete = f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {SEARCH_TABLE}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON fees_student BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON fees_student BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON fees_student BEGIN {delete} {insert} END",
+    ]
+
+
+def ensure_search_index(conn=connection, create=True):
+    """Create the FTS table and triggers if missing, rebuilding the index when anything was.
+
+    Migration 0008 creates them; this runs with create=False (repair only) after every migrate:
+    SQLite's schema editor rebuilds a table for most column changes, which silently drops its
+    triggers.
+    """
+    if conn.vendor != 'sqlite' or 'fees_student' not in conn.introspection.table_names():
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE %s", [f'{SEARCH_TABLE}%'])
+        existing = {row[0] for row in cursor.fetchall()}
+        expected = {SEARCH_TABLE} | {f'{SEARCH_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')}
+        if expected <= existing or (not create and SEARCH_TABLE not in existing):
+            return False
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({', '.join(COLUMNS)}, "
+                f"content='fees_student', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: searches use the plain lookups instead
+            return False
+        for sql in _trigger_sql():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _use_index():
+    # Checked once per process; a miss is re-checked so a later migrate is picked up
+    if not _state['ready'] and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [SEARCH_TABLE])
+            _state['ready'] = cursor.fetchone() is not None
+    return _state['ready']
+
+
+def match_expression(text):
+    """FTS5 query matching every word of ``text`` as a prefix ('ali kh' -> "ali"* "kh"*), or None."""
+    tokens = _TOKEN.findall(text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def filter_students(queryset, text):
+    """Narrow a Student queryset to search matches, keeping its ordering/pagination intact."""
+    expression = match_expression(text)
+    if expression is None:
+        return queryset
+    if _use_index():
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [expression]
+        ))
+    # No FTS5: plain lookups, still without casting roll_no to text
+    query = Q()
+    for token in _TOKEN.findall(text):
+        word = Q(name__icontains=token) | Q(father_name__icontains=token) | Q(phone_number__startswith=token)
+        if token.isdigit():
+            word |= Q(roll_no=int(token))
+        query &= word
+    return queryset.filter(query)
+
+
+def typeahead(text, limit=TYPEAHEAD_LIMIT):
+    """Up to ``limit`` matches as dicts (id, name, roll_no, student_class), name matches first.
+
+    bm25 ranking has to score every match, which costs tens of ms for a one-letter prefix
+    on 50k students, so this takes two unranked index lookups that stop at ``limit`` instead.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    if not _use_index():
+        return list(filter_students(Student.objects.all(), text)
+                    .order_by('name').values('id', 'name', 'roll_no', 'student_class')[:limit])
+    sql = (f"SELECT s.id, s.name, s.roll_no, s.student_class FROM {SEARCH_TABLE} f "
+           f"JOIN fees_student s ON s.id = f.rowid WHERE {SEARCH_TABLE} MATCH %s")
+    with connection.cursor() as cursor:
+        cursor.execute(sql + " LIMIT %s", [f'{{name}} : ({expression})', limit])
+        rows = cursor.fetchall()
+        if len(rows) < limit:
+            seen = [row[0] for row in rows] or [0]
+            cursor.execute(sql + f" AND f.rowid NOT IN ({', '.join(['%s'] * len(seen))}) LIMIT %s",
+                           [expression, *seen, limit - len(rows)])
+            rows += cursor.fetchall()
+    return [dict(zip(('id', 'name', 'roll_no', 'student_class'), row)) for row in rows]
@@ -1,33 +1,76 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, pre_save, post_migrate
 from django.dispatch import receiver
-from .models import Student, FeePayment, FeeRecord
+from .models import Student, FeePayment, FeeRecord, ClassFee
+from . import aging, ledger, receipt_cache, search
+from .stats import invalidate_fee_stats
+from .class_fees import invalidate_class_fees
 from datetime import datetime
 
+def _student_cascade(kwargs):
+    # True when the row is being removed by a Student delete cascade
+    origin = kwargs.get('origin')
+    return getattr(origin, 'model', type(origin)) is Student
+
 @receiver(post_save, sender=Student)
 def create_initial_fee_record(sender, instance, created, **kwargs):
-    if created:
-        month_str = datetime.now().strftime("%B %Y")
-        due_date = datetime.now().replace(day=10).date()
-        FeeRecord.objects.get_or_create(
-            student=instance,
-            month=month_str,
-            defaults={'due_date': due_date, 'status': 'Unpaid'}
-        )
+    if created or instance.is_active:
+        # Active students always have a record for the current month
+        ledger.refresh_student_month(instance, datetime.now().date())
+    if not created:
+        # manual_fee / class changes move the expected amount of every month
+        ledger.refresh_student(instance)
+        # Name, roll number and class are printed on the student's receipts
+        receipt_cache.invalidate(*instance.feepayment_set.values_list('pk', flat=True))
+    invalidate_fee_stats()
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    invalidate_fee_stats()
+
+@receiver(pre_save, sender=FeePayment)
+def remember_previous_payment(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk:
+        instance._previous = FeePayment.objects.filter(pk=instance.pk).values_list('student_id', 'date').first()
 
 @receiver([post_save, post_delete], sender=FeePayment)
 def sync_fee_record_status(sender, instance, **kwargs):
-    month_str = instance.date.strftime("%B %Y")
-    record, created = FeeRecord.objects.get_or_create(
-        student=instance.student,
-        month=month_str,
-        defaults={'due_date': instance.date.replace(day=10), 'status': 'Unpaid'}
-    )
-    
-    # record.pending_amount is a dynamic property that uses the current DB state
-    if record.pending_amount <= 0:
-        record.status = 'Paid'
-        record.submission_date = instance.date
-    else:
-        record.status = 'Unpaid'
-        record.submission_date = None
-    record.save()
+    # Payments removed by a student delete cascade have no record left to sync; refreshing the
+    # month would recreate a FeeRecord for the student being deleted and fail the cascade
+    if _student_cascade(kwargs):
+        return
+
+    ledger.refresh_student_month(instance.student, instance.date)
+
+    # An edited payment may have moved out of another student's or month's record
+    previous = getattr(instance, '_previous', None)
+    if previous:
+        student_id, day = previous
+        if (student_id, day.year, day.month) != (instance.student_id, instance.date.year, instance.date.month):
+            ledger.refresh_records(
+                FeeRecord.objects.filter(student_id=student_id, period=ledger.month_start(day)).select_related('student')
+            )
+    invalidate_fee_stats()
+
+@receiver([post_save, post_delete], sender=FeePayment)
+def drop_cached_receipt(sender, instance, **kwargs):
+    receipt_cache.invalidate(instance.pk)
+
+@receiver(post_delete, sender=FeeRecord)
+def flag_student_aging(sender, instance, **kwargs):
+    # A deleted record leaves no updated_at behind; a student delete removes the aging row itself
+    if not _student_cascade(kwargs):
+        aging.mark_stale(instance.student_id)
+
+@receiver([post_save, post_delete], sender=ClassFee)
+def sync_class_fee_records(sender, instance, **kwargs):
+    invalidate_class_fees()
+    ledger.refresh_class(instance.student_class)
+    invalidate_fee_stats()
+
+@receiver(post_migrate)
+def restore_student_search(sender, using, **kwargs):
+    # Table rebuilds during migrate drop the search triggers; put them back and reindex
+    if sender.label == 'fees':
+        search.ensure_search_index(connections[using], create=False)
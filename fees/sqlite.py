@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply FMS_SQLITE_PRAGMAS to each new SQLite connection when FMS_SQLITE_TUNING is on."""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'FMS_SQLITE_TUNING', False):
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.FMS_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
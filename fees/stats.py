@@ -0,0 +1,133 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .models import FeePayment, FeeRecord, Student
+from . import ledger
+
+STATS_CACHE_KEY = 'fees:stats:{month}'
+KPIS_CACHE_KEY = 'fees:stats:kpis:{month}'
+REVENUE_CACHE_KEY = 'fees:stats:revenue:{month}'
+STATS_TIMEOUT = 60 * 10
+CHART_MONTHS = 6
+
+
+def month_starts(count, today=None):
+    """First day of the last ``count`` calendar months, oldest first, ending with the current one."""
+    today = today or date.today()
+    y, m = today.year, today.month
+    starts = []
+    for _ in range(count):
+        starts.append(date(y, m, 1))
+        if m == 1: m = 12; y -= 1
+        else: m -= 1
+    return starts[::-1]
+
+
+def _revenue_rows(since):
+    # One grouped query covers the chart and this month's collection
+    return (FeePayment.objects.filter(date__gte=since)
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .values('year', 'month').annotate(total=Sum('amount')))
+
+
+def _settled_records(today):
+    return FeeRecord.objects.filter(period=today.replace(day=1), student__is_active=True, pending_amount__lte=0)
+
+
+def _kpis(total_students, collected, active_count, settled_count, total_expected):
+    collection_rate = 0
+    if total_expected > 0:
+        collection_rate = int((collected / total_expected) * 100)
+    return {
+        'total_students': total_students,
+        'collected': collected,
+        # Active students without a settled record this month, including those with no record yet
+        'pending': active_count - settled_count,
+        'total_expected': total_expected,
+        'collection_rate': collection_rate,
+    }
+
+
+def _series(starts, revenue):
+    return {
+        'chart_labels': [d.strftime('%b') for d in starts],
+        'chart_data': [revenue.get((d.year, d.month), 0) for d in starts],
+    }
+
+
+def compute_fee_stats(today=None):
+    today = today or date.today()
+    starts = month_starts(CHART_MONTHS, today)
+    revenue = {(r['year'], r['month']): float(r['total']) for r in _revenue_rows(starts[0])}
+
+    active = Student.objects.filter(is_active=True)
+    stats = _kpis(
+        Student.objects.count(),
+        revenue.get((today.year, today.month), 0),
+        active.count(),
+        _settled_records(today).count(),
+        float(active.aggregate(total=Sum(ledger.expected_fee_expression()))['total'] or 0),
+    )
+    stats.update(_series(starts, revenue))
+    return stats
+
+
+async def acompute_kpis(today=None):
+    """The dashboard cards only, using the async ORM."""
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    collected = await FeePayment.objects.filter(
+        date__gte=month_start, date__lt=ledger.next_month(month_start)
+    ).aaggregate(total=Sum('amount'))
+    active = Student.objects.filter(is_active=True)
+    expected = await active.aaggregate(total=Sum(ledger.expected_fee_expression()))
+    return _kpis(
+        await Student.objects.acount(),
+        float(collected['total'] or 0),
+        await active.acount(),
+        await _settled_records(today).acount(),
+        float(expected['total'] or 0),
+    )
+
+
+async def acompute_revenue_series(today=None):
+    """The dashboard chart only, using the async ORM."""
+    starts = month_starts(CHART_MONTHS, today)
+    revenue = {(r['year'], r['month']): float(r['total']) async for r in _revenue_rows(starts[0])}
+    return _series(starts, revenue)
+
+
+def get_fee_stats():
+    """Dashboard/admin figures for the current month, cached until a payment or fee change."""
+    key = STATS_CACHE_KEY.format(month=date.today().strftime('%Y-%m'))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_fee_stats()
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+async def _acached(key_template, compute):
+    key = key_template.format(month=date.today().strftime('%Y-%m'))
+    value = await cache.aget(key)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, STATS_TIMEOUT)
+    return value
+
+
+async def aget_kpis():
+    """Cached separately from the chart so each dashboard widget loads on its own."""
+    return await _acached(KPIS_CACHE_KEY, acompute_kpis)
+
+
+async def aget_revenue_series():
+    return await _acached(REVENUE_CACHE_KEY, acompute_revenue_series)
+
+
+def invalidate_fee_stats():
+    month = date.today().strftime('%Y-%m')
+    cache.delete_many([key.format(month=month) for key in (STATS_CACHE_KEY, KPIS_CACHE_KEY, REVENUE_CACHE_KEY)])
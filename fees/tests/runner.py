@@ -0,0 +1,27 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner that keeps tests away from the project's own cache and file directories."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.scratch_dir = tempfile.mkdtemp(prefix='fms-tests-')
+        self.isolated = override_settings(
+            # One in-memory store per alias: nothing is read from or left in .cache between runs
+            CACHES={alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+                    for alias in settings.CACHES},
+            FMS_RECEIPT_CACHE_DIR=f'{self.scratch_dir}/receipts',
+            FMS_PROFILE_DIR=f'{self.scratch_dir}/profiles',
+        )
+        self.isolated.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.isolated.disable()
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
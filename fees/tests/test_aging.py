@@ -0,0 +1,101 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.test import TestCase
+
+from fees import aging, ledger
+from fees.models import AgingSnapshot, ClassAging, FeePayment, FeeRecord, Student, StudentAging
+
+MONTHS = [date(2026, month, 1) for month in (6, 7, 8, 9)]
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.ali = self.make_student('Ali', 1, '5', Decimal('100.00'))
+        self.sara = self.make_student('Sara', 2, '6', Decimal('70.00'))
+        self.omar = self.make_student('Omar', 3, '6', Decimal('50.00'))
+        # Saving a student also creates this month's record; keep only the months above
+        FeeRecord.objects.exclude(period__in=MONTHS).delete()
+        self.pay(self.sara, Decimal('70.00'), date(2026, 8, 3))
+
+    def make_student(self, name, roll_no, student_class, fee):
+        student = Student.objects.create(name=name, roll_no=roll_no, student_class=student_class, total_fees=fee)
+        for period in MONTHS:
+            ledger.refresh_student_month(student, period)
+        return student
+
+    def pay(self, student, amount, day):
+        FeePayment.objects.create(student=student, amount=amount, payment_mode='Cash', date=day)
+
+    def state(self):
+        fields = aging.BUCKETS + ['total']
+        latest = AgingSnapshot.objects.order_by('-date').first()
+        students = {row.pop('student_id'): row for row in StudentAging.objects.values('student_id', *fields)}
+        classes = {row.pop('student_class'): row
+                   for row in ClassAging.objects.filter(snapshot=latest).values('student_class', 'students', *fields)}
+        return students, classes
+
+    def assertMatchesFullRebuild(self, day):
+        incremental = self.state()
+        with transaction.atomic():
+            aging.take_snapshot(day, full=True)
+            full = self.state()
+            transaction.set_rollback(True)
+        self.assertEqual(incremental, full)
+
+    def test_first_snapshot_ages_everyone(self):
+        snapshot = aging.take_snapshot(date(2026, 10, 1))
+        self.assertEqual(snapshot.students_recomputed, 3)
+        students, classes = self.state()
+        # Due Jun 10 .. Sep 10, aged on Oct 1: 113, 83, 52 and 21 days
+        self.assertEqual(students[self.ali.pk], {
+            'days_0_30': Decimal('100.00'), 'days_31_60': Decimal('100.00'), 'days_61_90': Decimal('100.00'),
+            'days_over_90': Decimal('100.00'), 'total': Decimal('400.00'),
+        })
+        self.assertEqual(students[self.sara.pk]['total'], Decimal('210.00'))
+        self.assertEqual(classes['6']['students'], 2)
+        self.assertEqual(classes['6']['total'], Decimal('410.00'))
+
+    def test_incremental_snapshots_match_full_rebuild(self):
+        aging.take_snapshot(date(2026, 10, 1))
+
+        # Nothing written and no balance crosses a bucket boundary
+        self.assertEqual(aging.take_snapshot(date(2026, 10, 2)).students_recomputed, 0)
+        self.assertMatchesFullRebuild(date(2026, 10, 2))
+
+        # Sep 10 balances turn 31 days old on Oct 11
+        self.assertEqual(aging.take_snapshot(date(2026, 10, 11)).students_recomputed, 3)
+        self.assertMatchesFullRebuild(date(2026, 10, 11))
+
+        self.pay(self.ali, Decimal('100.00'), date(2026, 9, 20))
+        self.pay(self.omar, Decimal('200.00'), date(2026, 6, 5))
+        self.assertEqual(aging.take_snapshot(date(2026, 10, 12)).students_recomputed, 2)
+        self.assertMatchesFullRebuild(date(2026, 10, 12))
+
+        # A deleted record leaves nothing to find by updated_at; the student is flagged instead
+        FeeRecord.objects.get(student=self.sara, period=MONTHS[0]).delete()
+        self.assertTrue(StudentAging.objects.get(pk=self.sara.pk).stale)
+        self.assertEqual(aging.take_snapshot(date(2026, 10, 12)).students_recomputed, 1)
+        self.assertFalse(StudentAging.objects.filter(stale=True).exists())
+        self.assertMatchesFullRebuild(date(2026, 10, 12))
+
+    def test_settled_student_leaves_the_report(self):
+        aging.take_snapshot(date(2026, 10, 1))
+        for period in MONTHS:
+            self.pay(self.omar, Decimal('50.00'), period)
+        aging.take_snapshot(date(2026, 10, 2))
+        self.assertFalse(StudentAging.objects.filter(pk=self.omar.pk).exists())
+        _, classes = self.state()
+        self.assertEqual(classes['6']['students'], 1)
+
+    def test_rerunning_a_day_replaces_its_snapshot(self):
+        aging.take_snapshot(date(2026, 10, 1))
+        aging.take_snapshot(date(2026, 10, 1))
+        self.assertEqual(AgingSnapshot.objects.count(), 1)
+        self.assertEqual(ClassAging.objects.count(), 2)
+
+    def test_snapshots_must_move_forward(self):
+        aging.take_snapshot(date(2026, 10, 2))
+        with self.assertRaises(ValueError):
+            aging.take_snapshot(date(2026, 10, 1))
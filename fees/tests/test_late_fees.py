@@ -0,0 +1,94 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from fees import ledger
+from fees.late_fees import accrue, late_days
+from fees.models import FeePayment, FeeRecord, Student
+
+JUNE, JULY, AUGUST = date(2026, 6, 1), date(2026, 7, 1), date(2026, 8, 1)
+
+
+class LateDaysTests(SimpleTestCase):
+    def test_pending_counts_to_as_of(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, None, Decimal('50'), date(2026, 6, 25)), 15)
+
+    def test_pending_stops_at_month_end(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, None, Decimal('50'), date(2026, 9, 1)), 20)
+
+    def test_settled_counts_to_settlement(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, date(2026, 6, 14), 0, date(2026, 9, 1)), 4)
+
+    def test_settled_after_month_end_stops_at_month_end(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, date(2026, 8, 2), 0, date(2026, 9, 1)), 20)
+
+    def test_settled_on_time_is_not_late(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, date(2026, 6, 3), 0, date(2026, 9, 1)), 0)
+
+    def test_nothing_pending_and_no_payment(self):
+        self.assertEqual(late_days(date(2026, 6, 10), JUNE, None, 0, date(2026, 9, 1)), 0)
+
+
+class AccrueTests(TestCase):
+    rate = Decimal('1.00')
+
+    def make_student(self, roll_no, fee=Decimal('100.00'), months=(JUNE, JULY, AUGUST)):
+        student = Student.objects.create(name=f'Student {roll_no}', roll_no=roll_no, student_class='5',
+                                         total_fees=fee)
+        for period in months:
+            ledger.refresh_student_month(student, period)
+        return student
+
+    def pay(self, student, amount, day):
+        FeePayment.objects.create(student=student, amount=amount, payment_mode='Cash', date=day)
+
+    def record(self, student, period):
+        return FeeRecord.objects.get(student=student, period=period)
+
+    def test_arrears_chain(self):
+        student = self.make_student(1)
+        self.pay(student, Decimal('100.00'), date(2026, 6, 15))  # five days late, settled
+        # July stays unpaid; August is part paid
+        self.pay(student, Decimal('40.00'), date(2026, 8, 5))
+
+        accrue(date(2026, 8, 20), self.rate)
+        june, july, august = (self.record(student, p) for p in (JUNE, JULY, AUGUST))
+        self.assertEqual((june.late_fee, june.arrears), (Decimal('5.00'), Decimal('0.00')))
+        self.assertEqual((july.late_fee, july.arrears), (Decimal('21.00'), Decimal('0.00')))
+        # July's balance and its late fee; June's settled late fee is not carried
+        self.assertEqual((august.late_fee, august.arrears), (Decimal('10.00'), Decimal('121.00')))
+
+        self.assertEqual(accrue(date(2026, 8, 20), self.rate), (0, 0))
+
+    def test_paying_a_month_stops_carrying_its_late_fee(self):
+        student = self.make_student(1)
+        self.pay(student, Decimal('100.00'), date(2026, 6, 15))
+        accrue(date(2026, 8, 20), self.rate)
+        self.pay(student, Decimal('100.00'), date(2026, 7, 25))  # settles July, recorded late
+
+        accrue(date(2026, 8, 20), self.rate)
+        july, august = self.record(student, JULY), self.record(student, AUGUST)
+        self.assertEqual(july.late_fee, Decimal('15.00'))
+        self.assertEqual(august.arrears, Decimal('0.00'))
+
+    def test_matches_record_by_record_reference(self):
+        rng = random.Random(7)
+        months = [date(2026, m, 1) for m in range(1, 9)]
+        students = [self.make_student(n, Decimal(rng.choice([80, 100, 120])), months) for n in range(1, 16)]
+        for student in students:
+            for period in months:
+                if rng.random() < 0.7:
+                    day = period.replace(day=rng.randint(1, 28))
+                    self.pay(student, Decimal(rng.choice([30, 60, 100, 120])), day)
+        as_of = date(2026, 8, 17)
+
+        accrue(as_of, self.rate)
+        for student in students:
+            carried = Decimal('0.00')
+            for record in FeeRecord.objects.filter(student=student, period__lte=AUGUST).order_by('period'):
+                fee = self.rate * late_days(record.due_date, record.period, record.submission_date,
+                                            record.pending_amount, as_of)
+                self.assertEqual((record.late_fee, record.arrears), (fee, carried), record)
+                carried += record.pending_amount + (fee if record.pending_amount > 0 else 0)
@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from fees import ledger
+from fees.class_fees import invalidate_class_fees
+from fees.models import ClassFee, FeePayment, FeeRecord, Student
+
+JUNE, JULY, AUGUST = date(2026, 6, 1), date(2026, 7, 1), date(2026, 8, 1)
+
+
+class MonthTests(SimpleTestCase):
+    def test_month_start(self):
+        self.assertEqual(ledger.month_start(date(2026, 6, 17)), JUNE)
+
+    def test_next_month(self):
+        self.assertEqual(ledger.next_month(JUNE), JULY)
+        self.assertEqual(ledger.next_month(date(2026, 12, 1)), date(2027, 1, 1))
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        # The class fee map is kept per process and would outlive rolled-back test data
+        invalidate_class_fees()
+        self.addCleanup(invalidate_class_fees)
+
+    def make_student(self, roll_no, student_class='5', fee=Decimal('100.00'), manual_fee=None, months=(JUNE, JULY)):
+        student = Student.objects.create(name=f'Student {roll_no}', roll_no=roll_no, student_class=student_class,
+                                         total_fees=fee, manual_fee=manual_fee)
+        for period in months:
+            ledger.refresh_student_month(student, period)
+        return student
+
+    def pay(self, student, amount, day):
+        return FeePayment.objects.create(student=student, amount=amount, payment_mode='Cash', date=day)
+
+    def record(self, student, period):
+        return FeeRecord.objects.get(student=student, period=period)
+
+    def test_new_record_is_due_on_the_tenth(self):
+        june = self.record(self.make_student(1), JUNE)
+        self.assertEqual(june.due_date, date(2026, 6, 10))
+        self.assertEqual((june.expected_amount, june.paid_amount, june.pending_amount, june.status),
+                         (Decimal('100.00'), Decimal('0.00'), Decimal('100.00'), 'Unpaid'))
+
+    def test_payments_settle_their_month(self):
+        student = self.make_student(1)
+        self.pay(student, Decimal('40.00'), date(2026, 6, 3))
+        june = self.record(student, JUNE)
+        self.assertEqual((june.paid_amount, june.pending_amount, june.status, june.submission_date),
+                         (Decimal('40.00'), Decimal('60.00'), 'Unpaid', None))
+
+        self.pay(student, Decimal('70.00'), date(2026, 6, 12))
+        june = self.record(student, JUNE)
+        # Overpaying never leaves a negative balance
+        self.assertEqual((june.paid_amount, june.pending_amount, june.status, june.submission_date),
+                         (Decimal('110.00'), Decimal('0.00'), 'Paid', date(2026, 6, 12)))
+        self.assertEqual(self.record(student, JULY).status, 'Unpaid')
+
+    def test_moved_payment_refreshes_both_months(self):
+        student = self.make_student(1)
+        payment = self.pay(student, Decimal('100.00'), date(2026, 6, 3))
+        payment.date = date(2026, 7, 3)
+        payment.save()
+        self.assertEqual(self.record(student, JUNE).pending_amount, Decimal('100.00'))
+        self.assertEqual(self.record(student, JULY).status, 'Paid')
+
+    def test_expected_fee_precedence(self):
+        ClassFee.objects.create(student_class='5', fee_amount=Decimal('80.00'))
+        by_class = self.make_student(1)
+        manual = self.make_student(2, manual_fee=Decimal('60.00'))
+        other_class = self.make_student(3, student_class='6')
+        self.assertEqual(self.record(by_class, JUNE).expected_amount, Decimal('80.00'))
+        self.assertEqual(self.record(manual, JUNE).expected_amount, Decimal('60.00'))
+        self.assertEqual(self.record(other_class, JUNE).expected_amount, Decimal('100.00'))
+
+    def test_class_fee_change_refreshes_the_class(self):
+        student = self.make_student(1)
+        manual = self.make_student(2, manual_fee=Decimal('60.00'))
+        class_fee = ClassFee.objects.create(student_class='5', fee_amount=Decimal('80.00'))
+        self.assertEqual(self.record(student, JULY).pending_amount, Decimal('80.00'))
+        self.assertEqual(self.record(manual, JULY).pending_amount, Decimal('60.00'))
+
+        class_fee.delete()
+        self.assertEqual(self.record(student, JULY).pending_amount, Decimal('100.00'))
+
+    def test_refresh_months_after_bulk_payments(self):
+        student = self.make_student(1, months=(JUNE,))
+        FeePayment.objects.bulk_create([
+            FeePayment(student=student, amount=Decimal('100.00'), payment_mode='Cash', date=date(2026, 6, 2)),
+            FeePayment(student=student, amount=Decimal('30.00'), payment_mode='Cash', date=date(2026, 7, 2)),
+        ])
+        self.assertEqual(ledger.refresh_months([(student.pk, date(2026, 6, 2)), (student.pk, date(2026, 7, 2))]), 2)
+        self.assertEqual(self.record(student, JUNE).status, 'Paid')
+        self.assertEqual(self.record(student, JULY).pending_amount, Decimal('70.00'))
+
+    def test_generate_month_records(self):
+        ClassFee.objects.create(student_class='6', fee_amount=Decimal('75.00'))
+        plain = self.make_student(1, months=())
+        by_class = self.make_student(2, student_class='6', months=())
+        inactive = self.make_student(3, months=())
+        Student.objects.filter(pk=inactive.pk).update(is_active=False)
+        existing = self.make_student(4, months=(AUGUST,))
+        self.pay(plain, Decimal('100.00'), date(2026, 8, 1))
+        # Drop the records the payment signal created, as if it was paid before the month was generated
+        FeeRecord.objects.filter(period=AUGUST).exclude(student=existing).delete()
+
+        self.assertEqual(ledger.generate_month_records(date(2026, 8, 20)), 2)
+        self.assertEqual(ledger.generate_month_records(date(2026, 8, 20)), 0)
+        self.assertEqual(set(FeeRecord.objects.filter(period=AUGUST).values_list('student_id', flat=True)),
+                         {plain.pk, by_class.pk, existing.pk})
+        self.assertEqual(self.record(plain, AUGUST).status, 'Paid')
+        self.assertEqual(self.record(by_class, AUGUST).pending_amount, Decimal('75.00'))
@@ -0,0 +1,82 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from fees import metrics
+from fees.models import CustomUser
+
+
+# Django only logs handler adaptation with DEBUG on
+@override_settings(DEBUG=True)
+class AsyncMiddlewareTests(SimpleTestCase):
+    def adapted(self):
+        """Installed middleware the ASGI handler had to run through a sync/async adapter."""
+        with self.assertLogs('django.request', logging.DEBUG) as logs:
+            logging.getLogger('django.request').debug('loading middleware')
+            ASGIHandler().load_middleware(is_async=True)
+        adapted = re.findall(r'handler adapted for middleware (\S+)\.$', '\n'.join(logs.output), re.M)
+        # A disabled middleware is adapted for before it raises MiddlewareNotUsed and is dropped
+        unused = re.findall(r"MiddlewareNotUsed: '(\S+)'", '\n'.join(logs.output))
+        return [name for name in adapted if name not in unused]
+
+    def test_default_chain_runs_natively_under_asgi(self):
+        self.assertEqual(self.adapted(), [])
+
+    @override_settings(FMS_REQUEST_METRICS=True)
+    def test_request_metrics_run_natively_under_asgi(self):
+        self.assertEqual(self.adapted(), [])
+
+    @override_settings(FMS_PROFILING=True)
+    def test_profiling_runs_natively_under_asgi(self):
+        self.assertEqual(self.adapted(), [])
+
+
+@override_settings(FMS_REQUEST_METRICS=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        # The test database connection was opened before the middleware hooked connection_created
+        for connection in connections.all(initialized_only=True):
+            metrics.install(connection)
+        self.user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+
+    def test_sync_view_queries_are_counted(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('fees:manage_list', args=['student']))
+        self.assertRegex(response['Server-Timing'], r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    async def test_async_view_queries_are_counted(self):
+        # The async views' queries run on sync_to_async threads with their own connections
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('fees:dashboard_kpis'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        settings = override_settings(FMS_PROFILING=True, FMS_PROFILE_DIR=self.profile_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+
+    async def test_async_request_is_profiled_for_superusers(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+        response = await self.async_client.get(reverse('fees:dashboard_kpis'), {'_profile': '1'})
+        self.assertIn(response['X-Profile-Id'], os.listdir(self.profile_dir))
+
+    async def test_async_request_is_not_profiled_for_staff(self):
+        staff = await sync_to_async(CustomUser.objects.create_user)('staff', 'staff@example.com', 'pass12345')
+        await sync_to_async(self.async_client.force_login)(staff)
+        response = await self.async_client.get(reverse('fees:dashboard_kpis'), {'_profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from fees.models import FeeRecord, Student
+from fees.pagination import cached_count, decode_cursor, encode_cursor, invalidate_count, keyset_page
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor('5', 12)), ['5', 12])
+
+    def test_malformed_tokens(self):
+        for token in (None, '', 'not base64!', encode_cursor('5', 12)[:-4], 'WzEsMiwzXQ=='):  # last is [1,2,3]
+            self.assertIsNone(decode_cursor(token), token)
+
+
+class KeysetPageTests(TestCase):
+    page_size = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        # Few distinct classes, so most pages start and end inside a run of equal values
+        for roll_no in range(1, 24):
+            Student.objects.create(name=f'Student {roll_no}', roll_no=roll_no,
+                                   student_class=str(roll_no % 3), total_fees=Decimal('100.00'))
+
+    def expected(self, descending=False):
+        rows = Student.objects.values_list('student_class', 'pk')
+        return [pk for _, pk in sorted(rows, reverse=descending)]
+
+    def page(self, **kwargs):
+        return keyset_page(Student.objects.all(), 'student_class', page_size=self.page_size, **kwargs)
+
+    def walk_forward(self, descending=False):
+        """Follow next cursors from the first page; returns the pages' pks and the last page's prev cursor."""
+        pages = []
+        rows, next_cursor, prev_cursor = self.page(descending=descending)
+        self.assertIsNone(prev_cursor)
+        pages.append([s.pk for s in rows])
+        while next_cursor:
+            rows, next_cursor, prev_cursor = self.page(descending=descending, after=next_cursor)
+            self.assertIsNotNone(prev_cursor)
+            pages.append([s.pk for s in rows])
+        return pages, prev_cursor
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        pages, _ = self.walk_forward()
+        self.assertEqual(len(pages), 6)
+        self.assertEqual([pk for page in pages for pk in page], self.expected())
+
+    def test_descending_walk(self):
+        pages, _ = self.walk_forward(descending=True)
+        self.assertEqual([pk for page in pages for pk in page], self.expected(descending=True))
+
+    def test_backward_walk_returns_the_same_pages(self):
+        forward, prev_cursor = self.walk_forward()
+        backward = []
+        while prev_cursor:
+            rows, next_cursor, prev_cursor = self.page(before=prev_cursor)
+            self.assertIsNotNone(next_cursor)
+            backward.append([s.pk for s in rows])
+        self.assertEqual(backward[::-1], forward[:-1])
+
+    def test_tampered_cursor_gives_first_page(self):
+        first, _, _ = self.page()
+        for token in ('garbage', encode_cursor('1', 'abc'), encode_cursor(None, 3), encode_cursor('1', None)):
+            rows, _, prev_cursor = self.page(after=token)
+            self.assertEqual(rows, first, token)
+            self.assertIsNone(prev_cursor)
+
+    def test_related_order_field(self):
+        records = FeeRecord.objects.all()
+        expected = [pk for _, pk in sorted(records.values_list('student__student_class', 'pk'))]
+        walked = []
+        rows, next_cursor, _ = keyset_page(records, 'student__student_class', page_size=self.page_size)
+        walked.extend(r.pk for r in rows)
+        while next_cursor:
+            rows, next_cursor, _ = keyset_page(records, 'student__student_class', after=next_cursor,
+                                               page_size=self.page_size)
+            walked.extend(r.pk for r in rows)
+        self.assertEqual(walked, expected)
+
+
+class CachedCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Student.objects.create(name='Ali', roll_no=1, student_class='5', total_fees=Decimal('100.00'))
+
+    def test_count_is_cached_until_invalidated(self):
+        self.assertEqual(cached_count(Student.objects.all()), 1)
+        Student.objects.create(name='Sara', roll_no=2, student_class='5', total_fees=Decimal('100.00'))
+        self.assertEqual(cached_count(Student.objects.all()), 1)
+        invalidate_count(Student)
+        self.assertEqual(cached_count(Student.objects.all()), 2)
+
+    def test_queries_are_counted_separately(self):
+        Student.objects.create(name='Sara', roll_no=2, student_class='6', total_fees=Decimal('100.00'))
+        self.assertEqual(cached_count(Student.objects.all()), 2)
+        self.assertEqual(cached_count(Student.objects.filter(student_class='6')), 1)
@@ -0,0 +1,89 @@
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from fees import search
+from fees.models import Student
+
+
+def has_index():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [search.SEARCH_TABLE])
+        return cursor.fetchone() is not None
+
+
+class MatchExpressionTests(SimpleTestCase):
+    def test_every_word_is_a_prefix(self):
+        self.assertEqual(search.match_expression('ali kh'), '"ali"* "kh"*')
+
+    def test_punctuation_cannot_reach_the_query(self):
+        self.assertEqual(search.match_expression('"ali" OR -(kh*'), '"ali"* "OR"* "kh"*')
+
+    def test_nothing_to_match(self):
+        self.assertIsNone(search.match_expression(''))
+        self.assertIsNone(search.match_expression(' -* '))
+
+
+class SearchMixin:
+    def setUp(self):
+        self.ali = self.make_student('Ali Khan', 101, father_name='Imran Khan', phone_number='03001234567')
+        self.alina = self.make_student('Alina Shah', 202, phone_number='03219876543')
+        self.sara = self.make_student('Sara Malik', 303, father_name='Ali Malik')
+
+    def make_student(self, name, roll_no, **fields):
+        return Student.objects.create(name=name, roll_no=roll_no, student_class='5', total_fees=Decimal('100.00'),
+                                      **fields)
+
+    def find(self, text):
+        return set(search.filter_students(Student.objects.all(), text).values_list('name', flat=True))
+
+    def test_prefix_match_on_name(self):
+        self.assertEqual(self.find('ali'), {'Ali Khan', 'Alina Shah', 'Sara Malik'})
+        self.assertEqual(self.find('alin'), {'Alina Shah'})
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.find('ali kh'), {'Ali Khan'})
+        self.assertEqual(self.find('sara khan'), set())
+
+    def test_roll_no_and_phone(self):
+        self.assertEqual(self.find('202'), {'Alina Shah'})
+        self.assertEqual(self.find('0300'), {'Ali Khan'})
+
+    def test_blank_text_leaves_the_queryset_alone(self):
+        self.assertEqual(len(self.find('  ')), 3)
+
+    def test_follows_updates_and_deletes(self):
+        Student.objects.filter(pk=self.alina.pk).update(name='Zainab Shah')
+        self.sara.delete()
+        self.assertEqual(self.find('ali'), {'Ali Khan'})
+        self.assertEqual(self.find('zain'), {'Zainab Shah'})
+
+    def test_typeahead_lists_name_matches_first(self):
+        rows = search.typeahead('ali', 2)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row['name'] for row in rows}, {'Ali Khan', 'Alina Shah'})
+        self.assertEqual(set(rows[0]), {'id', 'name', 'roll_no', 'student_class'})
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The search index is SQLite FTS5')
+class IndexedSearchTests(SearchMixin, TestCase):
+    def setUp(self):
+        if not has_index():
+            self.skipTest('SQLite built without FTS5')
+        super().setUp()
+
+    def test_uses_the_index(self):
+        sql = str(search.filter_students(Student.objects.all(), 'ali').query)
+        self.assertIn(search.SEARCH_TABLE, sql)
+
+
+class FallbackSearchTests(SearchMixin, TestCase):
+    """The plain lookups used when SQLite has no FTS5."""
+
+    def setUp(self):
+        patcher = mock.patch('fees.search._use_index', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from fees import throttle
+
+RATES = {'password_reset': (5, 20, 900)}
+
+
+class ThrottleTests(SimpleTestCase):
+    def setUp(self):
+        # The production backend: its incr() is what used to reset the counters' timeout
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings = override_settings(
+            CACHES={alias: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                            'LOCATION': f'{self.cache_dir}/{alias}'} for alias in ('default', throttle.CACHE_ALIAS)},
+            FMS_THROTTLE=True, FMS_THROTTLE_RATES=RATES,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.now = 1_000_000 * 900 + 10  # early in a window
+
+    def fail(self, times, username='alice', ip='10.0.0.1'):
+        with mock.patch('time.time', return_value=self.now):
+            for _ in range(times):
+                throttle.record_failure('password_reset', username, ip)
+
+    def is_blocked(self, username='alice', ip='10.0.0.1'):
+        with mock.patch('time.time', return_value=self.now):
+            return throttle.is_blocked('password_reset', username, ip)
+
+    def test_blocks_after_limit(self):
+        self.fail(4)
+        self.assertFalse(self.is_blocked())
+        self.fail(1)
+        self.assertTrue(self.is_blocked())
+        self.assertFalse(self.is_blocked(username='bob', ip='10.0.0.2'))
+
+    def test_failures_outlive_the_default_cache_timeout(self):
+        self.fail(5)
+        self.now += 301
+        self.assertTrue(self.is_blocked())
+
+    def test_failures_expire_with_the_window(self):
+        self.fail(5)
+        self.now += 900 * 2
+        self.assertFalse(self.is_blocked())
+
+    def test_clear_forgets_the_username_only(self):
+        self.fail(5)
+        ip_key = throttle.KEY.format(scope='password_reset', kind='ip', ident=throttle._ident('10.0.0.1'),
+                                     bucket=int(self.now // 900))
+        with mock.patch('time.time', return_value=self.now):
+            throttle.clear('password_reset', 'alice')
+            self.assertEqual(caches[throttle.CACHE_ALIAS].get(ip_key), 5)
+        self.assertFalse(self.is_blocked())
+
+    def test_stats_counters_do_not_expire(self):
+        with mock.patch('time.time', return_value=self.now):
+            throttle.timed_check('password_reset', lambda: True)
+        self.now += 3600
+        with mock.patch('time.time', return_value=self.now):
+            self.assertEqual(throttle.summary()[0]['checks'], 1)
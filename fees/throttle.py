@@ -0,0 +1,126 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Failed attempts are counted per username and per client IP in the shared 'throttle' cache, so
+# every worker sees the same totals. It is kept apart from the default cache and sized far above
+# its 300-entry default, so a spray of random usernames can't cull the counters of the account
+# actually under attack. Each limit is a sliding window approximated from two fixed
+# buckets: the previous bucket's count weighted by how much of it still overlaps the window,
+# plus the current one. Increments are a get() then set(), not atomic, so concurrent failures
+# can be undercounted slightly; that only loosens the limit.
+CACHE_ALIAS = 'throttle'
+KEY = 'fees:throttle:{scope}:{kind}:{ident}:{bucket}'
+STATS_KEY = 'fees:throttle:stats:{scope}:{name}'
+STATS = ('checks', 'check_us', 'rejected')
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _rates(scope):
+    # (attempts per username, attempts per client IP, window in seconds), or None when off
+    if not getattr(settings, 'FMS_THROTTLE', True):
+        return None
+    return getattr(settings, 'FMS_THROTTLE_RATES', {}).get(scope)
+
+
+def client_ip(request):
+    # REMOTE_ADDR only; behind a reverse proxy it is the proxy's address unless the proxy rewrites it
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+def _ident(value):
+    # Usernames can hold characters that some cache backends don't allow in keys
+    return hashlib.sha256(str(value or '').strip().lower().encode('utf-8')).hexdigest()[:16]
+
+
+def _incr(key, delta=1, timeout=None):
+    # Not cache.incr(): the file cache implements it as get() + set() with the default TIMEOUT
+    # (300 s), which would cut every counter's lifetime short. Write back with our own timeout.
+    value = _cache().get(key, 0) + delta
+    _cache().set(key, value, timeout)
+    return value
+
+
+def _identities(username, ip, rates):
+    return [('user', _ident(username), rates[0]), ('ip', _ident(ip), rates[1])]
+
+
+def is_blocked(scope, username, ip, now=None):
+    """True if the username or IP already has too many recent failures; checked before any hashing."""
+    rates = _rates(scope)
+    if not rates:
+        return False
+    window = rates[2]
+    now = time.time() if now is None else now
+    bucket, offset = divmod(now, window)
+    keys = {}
+    for kind, ident, limit in _identities(username, ip, rates):
+        current = KEY.format(scope=scope, kind=kind, ident=ident, bucket=int(bucket))
+        previous = KEY.format(scope=scope, kind=kind, ident=ident, bucket=int(bucket) - 1)
+        keys[kind] = (current, previous, limit)
+    counts = _cache().get_many([key for current, previous, _ in keys.values() for key in (current, previous)])
+    for current, previous, limit in keys.values():
+        estimate = counts.get(current, 0) + counts.get(previous, 0) * (1 - offset / window)
+        if estimate >= limit:
+            _incr(STATS_KEY.format(scope=scope, name='rejected'))
+            return True
+    return False
+
+
+def record_failure(scope, username, ip, now=None):
+    rates = _rates(scope)
+    if not rates:
+        return
+    window = rates[2]
+    bucket = int((time.time() if now is None else now) // window)
+    for kind, ident, _ in _identities(username, ip, rates):
+        # Kept for two windows: the current bucket and, later, as the previous one
+        _incr(KEY.format(scope=scope, kind=kind, ident=ident, bucket=bucket), timeout=window * 2)
+
+
+def clear(scope, username, now=None):
+    """Forget a username's failures after it succeeds; the IP's count is left alone."""
+    rates = _rates(scope)
+    if not rates:
+        return
+    bucket = int((time.time() if now is None else now) // rates[2])
+    ident = _ident(username)
+    _cache().delete_many([KEY.format(scope=scope, kind='user', ident=ident, bucket=b) for b in (bucket, bucket - 1)])
+
+
+def timed_check(scope, check, *args, **kwargs):
+    """Run a password/answer check, adding its CPU time to the scope's counters."""
+    start = time.thread_time()
+    try:
+        return check(*args, **kwargs)
+    finally:
+        _incr(STATS_KEY.format(scope=scope, name='checks'))
+        _incr(STATS_KEY.format(scope=scope, name='check_us'), int((time.thread_time() - start) * 1_000_000))
+
+
+def summary():
+    """Per scope: hash checks run, average check CPU ms, attempts rejected and the CPU they'd have cost."""
+    scopes = sorted(getattr(settings, 'FMS_THROTTLE_RATES', {}))
+    values = _cache().get_many([STATS_KEY.format(scope=s, name=n) for s in scopes for n in STATS])
+    rows = []
+    for scope in scopes:
+        checks, check_us, rejected = (values.get(STATS_KEY.format(scope=scope, name=n), 0) for n in STATS)
+        avg_ms = check_us / checks / 1000 if checks else 0
+        rows.append({
+            'scope': scope,
+            'checks': checks,
+            'avg_check_ms': avg_ms,
+            'rejected': rejected,
+            'saved_cpu_s': rejected * avg_ms / 1000,
+        })
+    return rows
+
+
+def reset_stats():
+    scopes = getattr(settings, 'FMS_THROTTLE_RATES', {})
+    _cache().delete_many([STATS_KEY.format(scope=s, name=n) for s in scopes for n in STATS])
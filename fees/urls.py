@@ -5,6 +5,9 @@ app_name = 'fees'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
+    path('api/dashboard/kpis/', views.dashboard_kpis, name='dashboard_kpis'),
+    path('api/dashboard/revenue/', views.dashboard_revenue, name='dashboard_revenue'),
+    path('api/dashboard/recent-payments/', views.dashboard_recent_payments, name='dashboard_recent_payments'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('forgot-password/', views.forgot_password, name='forgot_password'),
@@ -16,9 +19,16 @@ urlpatterns = [
     path('manage/<str:model_name>/edit/<int:pk>/', views.manage_form, name='manage_form_pk'),
 
     path('students/', views.students_list, name='students_list'),
+    path('students/search/', views.student_search, name='student_search'),
     path('students/paid/', views.paid_students_list, name='paid_students_list'),
     path('students/unpaid/', views.unpaid_students_list, name='unpaid_students_list'),
     path('monthly-fees/', views.monthly_fees, name='monthly_fees'),
+    path('reports/aging/', views.aging_report, name='aging_report'),
     path('receipt/<int:payment_id>/', views.generate_receipt, name='generate_receipt'),
     path('export/fees/', views.export_fees_excel, name='export_fees_excel'),
+    path('documents/', views.batch_documents_view, name='batch_documents'),
+    path('payments/import/', views.import_payments_view, name='import_payments'),
+    path('metrics/', views.request_metrics, name='request_metrics'),
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:name>/', views.profile_detail, name='profile_detail'),
 ]
@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import bcrypt
+
+POOL_THRESHOLD = 4
+CHUNK_SIZE = 8
+
+
+def normalize_answer(raw_answer):
+    # Answers are compared case- and whitespace-insensitively
+    return str(raw_answer).strip().lower()
+
+
+def hash_security_answer(raw_answer):
+    """bcrypt hash of a security answer, as stored in CustomUser.security_answer."""
+    return bcrypt.hashpw(normalize_answer(raw_answer).encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def _hash_pair(hasher, pair):
+    password, answer = pair
+    return (
+        hasher.encode(password, hasher.salt()) if password is not None and hasher else None,
+        hash_security_answer(answer) if answer else None,
+    )
+
+
+def hash_credentials(pairs, hasher=None, workers=None):
+    """Hash (password, security answer) pairs, either may be None, across CPU cores.
+
+    ``hasher`` is a Django password hasher instance (get_hasher()); it is pickled to the
+    workers along with the pairs. Returns (encoded password, answer hash) tuples in order.
+    """
+    pairs = list(pairs)
+    workers = workers or os.cpu_count() or 1
+    work = partial(_hash_pair, hasher)
+    if workers == 1 or len(pairs) < POOL_THRESHOLD:
+        return list(map(work, pairs))
+    # Hashing needs only hashlib and bcrypt, so a fresh 'spawn' process needs no Django setup
+    # and inherits no database connection from this one.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(work, pairs, chunksize=CHUNK_SIZE))
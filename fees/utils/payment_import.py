@@ -0,0 +1,114 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from openpyxl import load_workbook
+
+from fees import ledger
+from fees.models import FeePayment, Student
+from fees.stats import invalidate_fee_stats
+
+REQUIRED_COLUMNS = ['roll_no', 'amount', 'payment_mode', 'date']
+PAYMENT_MODES = {mode.lower(): mode for mode, _ in FeePayment.PAYMENT_CHOICES}
+BATCH_SIZE = 1000
+AMOUNT_FIELD = FeePayment._meta.get_field('amount')
+# Largest amount FeePayment.amount can store; SQLite wouldn't reject a longer one on insert
+MAX_AMOUNT = Decimal(10) ** (AMOUNT_FIELD.max_digits - AMOUNT_FIELD.decimal_places) - Decimal('0.01')
+
+
+def read_rows(fileobj, filename, required=REQUIRED_COLUMNS):
+    """Yield (line_number, {column: value}) from an uploaded .csv or .xlsx file."""
+    wb = None
+    if filename.lower().endswith('.xlsx'):
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+    else:
+        if isinstance(fileobj.read(0), bytes):
+            fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        rows = csv.reader(fileobj)
+
+    # A read-only workbook keeps its zip file open until closed, also when a row raises
+    try:
+        header = None
+        for line, values in enumerate(rows, start=1):
+            if header is None:
+                header = [str(v or '').strip().lower().replace(' ', '_') for v in values]
+                missing = [c for c in required if c not in header]
+                if missing:
+                    raise ValueError(f"Missing column(s): {', '.join(missing)}")
+                continue
+            if not any(v not in (None, '') for v in values):
+                continue
+            yield line, dict(zip(header, values))
+    finally:
+        if wb is not None:
+            wb.close()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{value}' (use YYYY-MM-DD)")
+
+
+def validate_rows(rows):
+    """Turn raw rows into unsaved FeePayments. Returns (payments, errors) with errors as (line, message)."""
+    rows = list(rows)
+    roll_numbers = set()
+    for _, row in rows:
+        try:
+            roll_numbers.add(int(row.get('roll_no')))
+        except (TypeError, ValueError):
+            pass
+    students = dict(Student.objects.filter(roll_no__in=roll_numbers).values_list('roll_no', 'id'))
+
+    payments, errors = [], []
+    for line, row in rows:
+        try:
+            try:
+                roll_no = int(row.get('roll_no'))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid roll number '{row.get('roll_no')}'")
+            if roll_no not in students:
+                raise ValueError(f"No student with roll number {roll_no}")
+            try:
+                amount = Decimal(str(row.get('amount')).strip()).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise ValueError(f"Invalid amount '{row.get('amount')}'")
+            if not amount.is_finite():
+                raise ValueError(f"Invalid amount '{row.get('amount')}'")
+            if amount <= 0:
+                raise ValueError("Amount must be greater than zero")
+            if amount > MAX_AMOUNT:
+                raise ValueError(f"Amount must not exceed {MAX_AMOUNT}")
+            mode = PAYMENT_MODES.get(str(row.get('payment_mode') or '').strip().lower())
+            if not mode:
+                raise ValueError(f"Payment mode must be one of: {', '.join(PAYMENT_MODES.values())}")
+            payments.append(FeePayment(
+                student_id=students[roll_no], amount=amount, payment_mode=mode, date=_parse_date(row.get('date'))
+            ))
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return payments, errors
+
+
+def import_payments(payments, batch_size=BATCH_SIZE):
+    """Insert payments in batches and recompute each affected (student, month) record once.
+
+    bulk_create skips the per-payment post_save signal, so the ledger sync happens here instead.
+    Returns the number of fee records refreshed.
+    """
+    with transaction.atomic():
+        FeePayment.objects.bulk_create(payments, batch_size=batch_size)
+        refreshed = ledger.refresh_months({(p.student_id, p.date) for p in payments})
+    invalidate_fee_stats()
+    return refreshed
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from fees import ledger
+from fees.models import FeePayment, FeeRecord, Student
+from .reports_monthly import last_months
+from .reports_pdf import receipt_data, render_document, render_pdf, statement_data
+
+# Below this many documents a worker pool costs more to start than it saves
+POOL_THRESHOLD = 20
+CHUNK_SIZE = 25
+STATEMENT_MONTHS = 12
+# Limits for a request from the web page, which renders in the request's own process; larger
+# batches go through the render_pdfs command, which uses the worker pool
+WEB_MAX_DAYS = 366
+WEB_MAX_DOCUMENTS = 500
+
+
+def receipt_documents(payments):
+    """Receipt dicts for a FeePayment queryset, in date order."""
+    return [receipt_data(p) for p in payments.select_related('student').order_by('date', 'id')]
+
+
+def statement_documents(students, start, end):
+    """Statement dicts for a Student queryset over the periods ``start``..``end`` (first-of-month dates)."""
+    records = {}
+    for record in (FeeRecord.objects.filter(student__in=students, period__gte=start, period__lte=end)
+                   .order_by('period')):
+        records.setdefault(record.student_id, []).append(record)
+    return [statement_data(s, records.get(s.id, [])) for s in students.order_by('roll_no')]
+
+
+def default_range(kind, today=None):
+    """(start, end) when none is given: this month's receipts, or the last STATEMENT_MONTHS months of statements."""
+    today = today or date.today()
+    if kind == 'statements':
+        first = last_months(STATEMENT_MONTHS, today)[0]
+        return date(first['year'], first['month'], 1), today
+    return today.replace(day=1), today
+
+
+def _batch_queryset(kind, start, end, student_class):
+    # The payments (receipts) or students (statements) a batch has one document for
+    if kind == 'receipts':
+        payments = FeePayment.objects.filter(date__gte=start, date__lte=end)
+        if student_class:
+            payments = payments.filter(student__student_class=student_class)
+        return payments
+    students = Student.objects.filter(is_active=True)
+    if student_class:
+        students = students.filter(student_class=student_class)
+    return students
+
+
+def count_documents(kind, start, end, student_class=None):
+    """How many documents batch_documents() would return, without building them."""
+    return _batch_queryset(kind, start, end, student_class).count()
+
+
+def batch_documents(kind, start, end, student_class=None):
+    """'receipts' for payments dated start..end, or 'statements' for active students over those months."""
+    queryset = _batch_queryset(kind, start, end, student_class)
+    if kind == 'receipts':
+        return receipt_documents(queryset)
+    return statement_documents(queryset, ledger.month_start(start), ledger.month_start(end))
+
+
+def _render_all(documents, workers):
+    # Yields (filename, bytes) as workers finish, in order, so results never pile up in memory
+    if workers == 1 or len(documents) < POOL_THRESHOLD:
+        yield from map(render_document, documents)
+        return
+    # Workers get plain dicts and only import reportlab, so a fresh 'spawn' process needs no
+    # Django setup and inherits no database connection or server threads from this one.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        yield from pool.map(render_document, documents, chunksize=CHUNK_SIZE)
+
+
+def render_zip(documents, workers=None):
+    """Render each document to its own PDF, in parallel across CPU cores, into a ZIP temporary file."""
+    workers = workers or os.cpu_count() or 1
+    output = tempfile.TemporaryFile()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in _render_all(documents, workers):
+            archive.writestr(filename, content)
+    output.seek(0)
+    return output
+
+
+def render_merged(documents):
+    """All documents as pages of one PDF.
+
+    reportlab lays out a single document in one process, so this runs serially; it still
+    shares the prepared styles and writes one file instead of N.
+    """
+    return render_pdf(documents)
@@ -0,0 +1,37 @@
+import csv
+
+from django.db.models import Sum
+
+from fees.aging import BUCKETS, BUCKET_LABELS
+from fees.models import AgingSnapshot, ClassAging, StudentAging
+from .reports_monthly import _Echo
+
+# Snapshots shown in the report's trend chart
+TREND_SNAPSHOTS = 90
+
+
+def student_aging(student_class=None):
+    """StudentAging rows with their student, largest balance first when ordered by -total."""
+    rows = StudentAging.objects.select_related('student')
+    if student_class:
+        rows = rows.filter(student__student_class=student_class)
+    return rows
+
+
+def stream_aging_csv(rows, chunk_size=1000):
+    """Yield a student_aging() queryset as CSV lines without loading it all."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['Student', 'Roll No', 'Class'] + [BUCKET_LABELS[b] for b in BUCKETS] + ['Total', 'As of'])
+    for row in rows.order_by('-total', 'pk').iterator(chunk_size=chunk_size):
+        yield writer.writerow([row.student.name, row.student.roll_no, row.student.student_class]
+                              + [f'{getattr(row, b):.2f}' for b in BUCKETS] + [f'{row.total:.2f}', row.as_of])
+
+
+def aging_trend(student_class=None, count=TREND_SNAPSHOTS):
+    """Bucket totals of the last ``count`` snapshots, oldest first, from the small per-class table."""
+    recent = AgingSnapshot.objects.order_by('-date').values('pk')[:count]
+    rows = ClassAging.objects.filter(snapshot__in=recent)
+    if student_class:
+        rows = rows.filter(student_class=student_class)
+    return list(rows.values('snapshot__date').annotate(**{b: Sum(b) for b in BUCKETS + ['total']})
+                .order_by('snapshot__date'))
@@ -1,50 +1,84 @@
-import io
+import tempfile
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+from .reports_monthly import iter_monthly_pivot
 
-def export_fees_to_excel(fee_records):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Fee Records Report"
+# (header, column width) - widths are fixed so we never have to re-read cells to size them
+COLUMNS = [
+    ("Student Name", 30), ("Roll No", 10), ("Class", 10), ("Month", 18),
+    ("Due Date", 14), ("Status", 10), ("Paid", 14), ("Pending", 14),
+]
+
+
+def export_fees_to_excel(fee_records, chunk_size=2000):
+    """Write fee records to an .xlsx temporary file and return it rewound to the start.
+
+    The workbook is write-only, so rows go straight to disk as they are appended and
+    memory stays flat however many records there are.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Fee Records Report")
+    for index, (_, width) in enumerate(COLUMNS, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
 
     # Header styling
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="4f46e5", end_color="4f46e5", fill_type="solid")
     header_alignment = Alignment(horizontal="center", vertical="center")
 
-    headers = ["Student Name", "Roll No", "Class", "Month", "Due Date", "Status"]
-    ws.append(headers)
-
-    for cell in ws[1]:
+    headers = []
+    for title, _ in COLUMNS:
+        cell = WriteOnlyCell(ws, value=title)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = header_alignment
+        headers.append(cell)
+    ws.append(headers)
 
     # Data rows
-    for record in fee_records:
+    for record in fee_records.select_related('student').iterator(chunk_size=chunk_size):
         ws.append([
             record.student.name,
             record.student.roll_no,
             record.student.student_class,
             record.month,
             record.due_date.strftime("%Y-%m-%d"),
-            record.status
+            record.status,
+            float(record.paid_amount),
+            float(record.pending_amount),
         ])
 
-    # Auto-adjust column widths
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    output = tempfile.TemporaryFile()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def export_monthly_to_excel(students, months):
+    """Write the monthly summary (see reports_monthly) to an .xlsx temporary file, rewound."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Monthly Summary")
+    ws.column_dimensions['A'].width = 30
+    for index in range(4, len(months) + 4):
+        ws.column_dimensions[get_column_letter(index)].width = 16
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4f46e5", end_color="4f46e5", fill_type="solid")
+    headers = []
+    for title in ['Student', 'Roll No', 'Class'] + [m['label'] for m in months]:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        headers.append(cell)
+    ws.append(headers)
+
+    for row in iter_monthly_pivot(students, months):
+        student = row['student']
+        ws.append([student.name, student.roll_no, student.student_class] + row['amounts'])
+
+    output = tempfile.TemporaryFile()
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,106 @@
+import csv
+from datetime import date
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from fees.models import FeePayment, FeeRecord
+
+MAX_MONTHS = 36
+
+
+def month_range(start, end):
+    """List of {'year', 'month', 'label'} dicts from start to end (inclusive), at most MAX_MONTHS long."""
+    y, m = start.year, start.month
+    months = []
+    while (y, m) <= (end.year, end.month) and len(months) < MAX_MONTHS:
+        months.append({'year': y, 'month': m, 'label': date(y, m, 1).strftime('%B %Y')})
+        if m == 12: m = 1; y += 1
+        else: m += 1
+    return months
+
+
+def last_months(count=12, today=None):
+    today = today or date.today()
+    y, m = today.year, today.month - (count - 1)
+    while m < 1:
+        m += 12; y -= 1
+    return month_range(date(y, m, 1), today)
+
+
+def parse_month_param(value):
+    """Parse a 'YYYY-MM' query parameter (as sent by <input type="month">), or None."""
+    try:
+        y, m = value.split('-')
+        return date(int(y), int(m), 1)
+    except (AttributeError, ValueError):
+        return None
+
+
+def monthly_pivot(students, months):
+    """Build the student x month amount matrix for ``students`` with one grouped query per table.
+
+    A cell is the sum of that month's payments; a month marked Paid without payments
+    shows the record's expected amount; anything else is None.
+    """
+    students = list(students)
+    if not students or not months:
+        return [{'student': s, 'amounts': [None] * len(months)} for s in students]
+
+    ids = [s.id for s in students]
+    first, last = months[0], months[-1]
+    end = date(last['year'] + 1, 1, 1) if last['month'] == 12 else date(last['year'], last['month'] + 1, 1)
+
+    payments = (FeePayment.objects
+                .filter(student_id__in=ids, date__gte=date(first['year'], first['month'], 1), date__lt=end)
+                .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+                .values('student_id', 'year', 'month')
+                .annotate(total=Sum('amount')))
+    paid = {(p['student_id'], p['year'], p['month']): p['total'] for p in payments}
+
+    settled = {}
+    for student_id, period, expected in (FeeRecord.objects
+                                         .filter(student_id__in=ids, period__gte=date(first['year'], first['month'], 1),
+                                                 period__lt=end, status='Paid')
+                                         .values_list('student_id', 'period', 'expected_amount')):
+        settled[(student_id, period.year, period.month)] = expected
+
+    table = []
+    for student in students:
+        row = {'student': student, 'amounts': []}
+        for mo in months:
+            key = (student.id, mo['year'], mo['month'])
+            amount = paid.get(key) or settled.get(key)
+            row['amounts'].append(float(amount) if amount else None)
+        table.append(row)
+    return table
+
+
+def iter_monthly_pivot(students, months, chunk_size=500):
+    """Yield pivot rows for a (possibly large) student queryset, chunk_size students at a time."""
+    last_roll = None
+    while True:
+        chunk = students if last_roll is None else students.filter(roll_no__gt=last_roll)
+        chunk = list(chunk.order_by('roll_no')[:chunk_size])
+        if not chunk:
+            return
+        yield from monthly_pivot(chunk, months)
+        last_roll = chunk[-1].roll_no
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def stream_monthly_csv(students, months):
+    """Yield the monthly summary as CSV lines, one student chunk at a time."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['Student', 'Roll No', 'Class'] + [m['label'] for m in months])
+    for row in iter_monthly_pivot(students, months):
+        student = row['student']
+        yield writer.writerow(
+            [student.name, student.roll_no, student.student_class]
+            + [('' if v is None else f"{v:.2f}") for v in row['amounts']]
+        )
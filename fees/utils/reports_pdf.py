@@ -1,74 +1,160 @@
 import io
+from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import A5
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.units import cm
 
-def generate_payment_receipt(payment):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A5, rightMargin=1*cm, leftMargin=1*cm, topMargin=1*cm, bottomMargin=1*cm)
+# Built once per process and shared by every document. Nothing here touches the ORM, so
+# batch workers (see pdf_batch) can import this module without setting Django up.
+ACCENT = colors.HexColor("#4f46e5")
+styles = getSampleStyleSheet()
+title_style = ParagraphStyle(
+    'MainTitle',
+    parent=styles['Heading1'],
+    fontSize=18,
+    spaceAfter=12,
+    alignment=1, # Center
+    textColor=ACCENT
+)
+info_table_style = TableStyle([
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+])
+total_table_style = TableStyle([
+    ('BACKGROUND', (1, 0), (2, 0), ACCENT),
+    ('TEXTCOLOR', (1, 0), (2, 0), colors.whitesmoke),
+    ('ALIGN', (1, 0), (2, 0), 'CENTER'),
+    ('FONTNAME', (1, 0), (2, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (1, 0), (2, 0), 12),
+    ('TOPPADDING', (1, 0), (2, 0), 10),
+    ('BOTTOMPADDING', (1, 0), (2, 0), 10),
+])
+statement_table_style = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), ACCENT),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('LINEABOVE', (0, -1), (-1, -1), 1, ACCENT),
+    ('LINEBELOW', (0, 1), (-1, -2), 0.5, colors.whitesmoke),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+
+def _money(value):
+    return f"${value:,.2f}"
+
+
+def receipt_data(payment):
+    """Everything a receipt shows, as a plain (picklable) dict."""
+    return {
+        'kind': 'receipt',
+        'filename': f"receipt-REC-{payment.id:06d}.pdf",
+        'id': payment.id,
+        'date': payment.date.strftime("%Y-%m-%d"),
+        'student_name': payment.student.name,
+        'roll_no': payment.student.roll_no,
+        'student_class': payment.student.student_class,
+        'payment_mode': payment.payment_mode,
+        'amount': payment.amount,
+    }
+
+
+def statement_data(student, records):
+    """A student's statement of account over ``records`` (their FeeRecords, oldest first), as a dict."""
+    rows = [(r.month, r.expected_amount, r.paid_amount, r.pending_amount, r.status) for r in records]
+    return {
+        'kind': 'statement',
+        'filename': f"statement-{student.roll_no}.pdf",
+        'student_name': student.name,
+        'roll_no': student.roll_no,
+        'student_class': student.student_class,
+        'rows': rows,
+        'expected': sum((r[1] for r in rows), 0),
+        'paid': sum((r[2] for r in rows), 0),
+        'pending': sum((r[3] for r in rows), 0),
+    }
+
+
+def receipt_elements(data):
     elements = []
-    styles = getSampleStyleSheet()
 
     # Title
-    title_style = ParagraphStyle(
-        'MainTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=12,
-        alignment=1, # Center
-        textColor=colors.HexColor("#4f46e5")
-    )
     elements.append(Paragraph("PAYMENT RECEIPT", title_style))
     elements.append(Paragraph("FMS PRO - Student Fees Management", styles['Normal']))
     elements.append(Spacer(1, 0.5*cm))
 
     # Payment Info Table
-    data = [
-        ["Receipt No:", f"REC-{payment.id:06d}"],
-        ["Date:", payment.date.strftime("%Y-%m-%d")],
-        ["Student Name:", payment.student.name],
-        ["Roll No:", payment.student.roll_no],
-        ["Class:", payment.student.student_class],
-        ["Payment Mode:", payment.payment_mode],
-        ["Amount Paid:", f"${payment.amount:,.2f}"],
+    info = [
+        ["Receipt No:", f"REC-{data['id']:06d}"],
+        ["Date:", data['date']],
+        ["Student Name:", data['student_name']],
+        ["Roll No:", data['roll_no']],
+        ["Class:", data['student_class']],
+        ["Payment Mode:", data['payment_mode']],
+        ["Amount Paid:", _money(data['amount'])],
     ]
-
-    table = Table(data, colWidths=[4*cm, 8*cm])
-    table.setStyle(TableStyle([
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-    ]))
+    table = Table(info, colWidths=[4*cm, 8*cm])
+    table.setStyle(info_table_style)
     elements.append(table)
     elements.append(Spacer(1, 1*cm))
 
     # Total Section
-    total_data = [
-        ["", "TOTAL PAID", f"${payment.amount:,.2f}"]
-    ]
-    total_table = Table(total_data, colWidths=[4*cm, 4*cm, 4*cm])
-    total_table.setStyle(TableStyle([
-        ('BACKGROUND', (1, 0), (2, 0), colors.HexColor("#4f46e5")),
-        ('TEXTCOLOR', (1, 0), (2, 0), colors.whitesmoke),
-        ('ALIGN', (1, 0), (2, 0), 'CENTER'),
-        ('FONTNAME', (1, 0), (2, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (1, 0), (2, 0), 12),
-        ('TOPPADDING', (1, 0), (2, 0), 10),
-        ('BOTTOMPADDING', (1, 0), (2, 0), 10),
-    ]))
+    total_table = Table([["", "TOTAL PAID", _money(data['amount'])]], colWidths=[4*cm, 4*cm, 4*cm])
+    total_table.setStyle(total_table_style)
     elements.append(total_table)
     elements.append(Spacer(1, 2*cm))
 
     # Signature
     elements.append(Paragraph("________________________", styles['Normal']))
     elements.append(Paragraph("Authorized Signature", styles['Normal']))
+    return elements
 
+
+def statement_elements(data):
+    elements = [
+        Paragraph("STATEMENT OF ACCOUNT", title_style),
+        Paragraph(f"{escape(data['student_name'])} - Roll No {data['roll_no']} - Class {escape(data['student_class'])}",
+                  styles['Normal']),
+        Spacer(1, 0.5*cm),
+    ]
+    rows = [["Month", "Expected", "Paid", "Pending", "Status"]]
+    rows += [[month, _money(expected), _money(paid), _money(pending), status]
+             for month, expected, paid, pending, status in data['rows']]
+    rows.append(["Total", _money(data['expected']), _money(data['paid']), _money(data['pending']), ""])
+    # Long histories flow onto further pages with the header repeated
+    table = Table(rows, colWidths=[3.6*cm, 2.4*cm, 2.4*cm, 2.4*cm, 2*cm], repeatRows=1)
+    table.setStyle(statement_table_style)
+    elements.append(table)
+    return elements
+
+
+ELEMENT_BUILDERS = {'receipt': receipt_elements, 'statement': statement_elements}
+
+
+def render_pdf(documents):
+    """Render receipt/statement dicts into one PDF, one document per page (or run of pages)."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A5, rightMargin=1*cm, leftMargin=1*cm, topMargin=1*cm, bottomMargin=1*cm)
+    elements = []
+    for data in documents:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(ELEMENT_BUILDERS[data['kind']](data))
     doc.build(elements)
     buffer.seek(0)
     return buffer
+
+
+def render_document(data):
+    """(filename, pdf bytes) for one document dict; the unit of work for batch workers."""
+    return data['filename'], render_pdf([data]).getvalue()
@@ -0,0 +1,44 @@
+import csv
+
+from django.db.models import DecimalField, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from fees import ledger
+from fees.models import FeeRecord, Student
+from .reports_monthly import _Echo
+
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+
+
+def fee_status_students(period, paid, student_class=None):
+    """Students who have (paid=True) or haven't (paid=False) settled ``period``, with that month's amounts.
+
+    Everything is correlated EXISTS/subqueries on the (student, period) record, so the page
+    costs the same few queries however many students there are. Unpaid covers records still
+    owing plus active students, enrolled by then, with no record for the month at all (an
+    anti-join); those owe their full expected fee.
+    """
+    records = FeeRecord.objects.filter(student=OuterRef('pk'), period=period)
+    if paid:
+        students = Student.objects.filter(Exists(records.filter(pending_amount__lte=0)))
+    else:
+        students = Student.objects.filter(
+            Exists(records.filter(pending_amount__gt=0))
+            | Q(is_active=True, created_at__date__lt=ledger.next_month(period)) & ~Exists(records)
+        )
+    if student_class:
+        students = students.filter(student_class=student_class)
+    return students.annotate(
+        paid_amount=Coalesce(Subquery(records.values('paid_amount')[:1]), Value(ledger.ZERO), output_field=MONEY),
+        pending_amount=Coalesce(Subquery(records.values('pending_amount')[:1]), ledger.expected_fee_expression(),
+                                output_field=MONEY),
+    )
+
+
+def stream_status_csv(students, chunk_size=1000):
+    """Yield a fee_status_students() queryset as CSV lines without loading it all."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['Student', 'Roll No', 'Class', 'Paid', 'Pending'])
+    for student in students.order_by('roll_no').iterator(chunk_size=chunk_size):
+        yield writer.writerow([student.name, student.roll_no, student.student_class,
+                               f'{student.paid_amount:.2f}', f'{student.pending_amount:.2f}'])
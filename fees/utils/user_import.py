@@ -0,0 +1,123 @@
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from fees.models import SECURITY_QUESTIONS, CustomUser
+from fees.utils.credentials import hash_credentials
+
+REQUIRED_COLUMNS = ['username', 'password']
+QUESTIONS = {key for key, _ in SECURITY_QUESTIONS}
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+BATCH_SIZE = 1000
+
+
+def _text(row, column):
+    value = row.get(column)
+    return '' if value is None else str(value).strip()
+
+
+def _names(row, column):
+    # Several groups/permissions per cell, separated by ';'
+    return [name.strip() for name in _text(row, column).split(';') if name.strip()]
+
+
+def _messages(error):
+    return ' '.join(error.messages)
+
+
+def validate_rows(rows):
+    """Turn raw rows into import entries. Returns (entries, errors) with errors as (line, message).
+
+    Each entry is a dict with an unsaved ``user`` plus its raw ``password`` and ``answer``, the
+    ``groups`` (names; missing ones are created on import) and ``permissions`` (ids) to assign.
+    Passwords go through AUTH_PASSWORD_VALIDATORS, as in the user form.
+    """
+    rows = list(rows)
+    usernames = {_text(row, 'username') for _, row in rows}
+    taken = set(CustomUser.objects.filter(username__in=usernames).values_list('username', flat=True))
+    codenames = {name.split('.', 1)[-1] for _, row in rows for name in _names(row, 'permissions')}
+    permissions = {
+        f'{app_label}.{codename}': pk for pk, app_label, codename in
+        Permission.objects.filter(codename__in=codenames).values_list('pk', 'content_type__app_label', 'codename')
+    }
+    username_field = CustomUser._meta.get_field('username')
+    email_field = CustomUser._meta.get_field('email')
+
+    entries, errors, seen = [], [], set()
+    for line, row in rows:
+        try:
+            try:
+                username = username_field.clean(_text(row, 'username'), None)
+                email = email_field.clean(_text(row, 'email'), None)
+            except ValidationError as e:
+                raise ValueError(_messages(e))
+            if username in taken:
+                raise ValueError(f"Username '{username}' already exists")
+            if username in seen:
+                raise ValueError(f"Username '{username}' appears more than once in the file")
+            question = _text(row, 'security_question') or None
+            if question and question not in QUESTIONS:
+                raise ValueError(f"Security question must be one of: {', '.join(sorted(QUESTIONS))}")
+            unknown = [name for name in _names(row, 'permissions') if name not in permissions]
+            if unknown:
+                raise ValueError(f"Unknown permission(s): {', '.join(unknown)} (use app_label.codename)")
+            user = CustomUser(
+                username=username, email=email, first_name=_text(row, 'first_name'),
+                last_name=_text(row, 'last_name'), security_question=question,
+                is_staff=_text(row, 'is_staff').lower() in TRUE_VALUES,
+            )
+            password = _text(row, 'password')
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                raise ValueError(_messages(e))
+        except ValueError as e:
+            errors.append((line, str(e)))
+            continue
+        seen.add(username)
+        entries.append({
+            'user': user,
+            'password': password,
+            'answer': _text(row, 'security_answer') or None,
+            'groups': _names(row, 'groups'),
+            'permissions': [permissions[name] for name in _names(row, 'permissions')],
+        })
+    return entries, errors
+
+
+def import_users(entries, workers=None, batch_size=BATCH_SIZE):
+    """Hash every password and security answer across CPU cores, then insert the users, any new
+    groups and the group/permission links in batches. Returns (users created, groups created).
+    """
+    hashes = hash_credentials(((e['password'], e['answer']) for e in entries), get_hasher(), workers)
+    for entry, (password, answer) in zip(entries, hashes):
+        entry['user'].password = password
+        entry['user'].security_answer = answer
+
+    group_names = {name for entry in entries for name in entry['groups']}
+    with transaction.atomic():
+        existing = set(Group.objects.filter(name__in=group_names).values_list('name', flat=True))
+        Group.objects.bulk_create([Group(name=name) for name in sorted(group_names - existing)], batch_size=batch_size)
+        group_ids = dict(Group.objects.filter(name__in=group_names).values_list('name', 'pk'))
+
+        CustomUser.objects.bulk_create([entry['user'] for entry in entries], batch_size=batch_size)
+        # bulk_create only sets primary keys on backends that support RETURNING
+        if any(entry['user'].pk is None for entry in entries):
+            user_ids = dict(CustomUser.objects.filter(username__in=[e['user'].username for e in entries])
+                            .values_list('username', 'pk'))
+            for entry in entries:
+                entry['user'].pk = user_ids[entry['user'].username]
+
+        memberships = CustomUser.groups.through
+        memberships.objects.bulk_create([
+            memberships(customuser_id=entry['user'].pk, group_id=group_ids[name])
+            for entry in entries for name in set(entry['groups'])
+        ], batch_size=batch_size)
+        grants = CustomUser.user_permissions.through
+        grants.objects.bulk_create([
+            grants(customuser_id=entry['user'].pk, permission_id=pk)
+            for entry in entries for pk in set(entry['permissions'])
+        ], batch_size=batch_size)
+    return len(entries), len(group_names - existing)
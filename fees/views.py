@@ -2,27 +2,49 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
-from .forms import LoginForm, SecurityAnswerForm, StudentForm, ClassFeeForm, FeeRecordForm, FeePaymentForm, CustomUserCreationForm, CustomUserUpdateForm, GroupForm
-from .models import FeePayment, FeeRecord, Student, ClassFee, CustomUser
-from django.db.models import Sum
-from datetime import datetime, date, timedelta
-import csv
-from .utils.reports_pdf import generate_payment_receipt
-import json
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse, Http404
+from .forms import LoginForm, SecurityAnswerForm, StudentForm, ClassFeeForm, FeeRecordForm, FeePaymentForm, CustomUserCreationForm, CustomUserUpdateForm, GroupForm, PaymentImportForm
+from .models import FeePayment, FeeRecord, Student, ClassFee, CustomUser, AgingSnapshot
+from django.db.models import Count, Sum
+from datetime import datetime, date
+from .utils.reports_monthly import monthly_pivot, stream_monthly_csv, month_range, last_months, parse_month_param
+from .utils.reports_status import fee_status_students, stream_status_csv
+from .utils.reports_aging import aging_trend, stream_aging_csv, student_aging
+from . import ledger
+from .stats import invalidate_fee_stats
+from . import stats
+from .pagination import keyset_page, cached_count, invalidate_count
+from django.core.paginator import Paginator
+from django.conf import settings
+from . import aging, metrics, profiling, receipt_cache, search, throttle
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils import dateformat
+from django.urls import reverse
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.contrib.auth.models import Group
 
 
+MONTHLY_PAGE_SIZE = 50
+
+
 def login_view(request):
     if request.method == 'POST':
         u = request.POST.get('username')
         p = request.POST.get('password')
-        user = authenticate(request, username=u, password=p)
+        ip = throttle.client_ip(request)
+        # Refused before authenticate(), so a flood of guesses costs no password hashing
+        if throttle.is_blocked('login', u, ip):
+            messages.error(request, 'Too many failed attempts. Please wait a few minutes and try again.')
+            return render(request, 'fees/login.html', status=429)
+        user = throttle.timed_check('login', authenticate, request, username=u, password=p)
         if user is not None:
+            throttle.clear('login', u)
             login(request, user)
             return redirect('fees:dashboard')
         else:
+            throttle.record_failure('login', u, ip)
             messages.error(request, 'Invalid username or password')
             return render(request, 'fees/login.html')
     return render(request, 'fees/login.html')
@@ -36,6 +58,7 @@ def logout_view(request):
 def forgot_password(request):
     step = 1
     question = None
+    status = 200
     if request.method == 'POST':
         if 'username' in request.POST and 'answer' not in request.POST and 'new_password' not in request.POST:
             username = request.POST.get('username')
@@ -58,9 +81,15 @@ def forgot_password(request):
                 return redirect('fees:forgot_password')
             user = CustomUser.objects.get(username=uname)
             question = dict(CustomUser._meta.get_field('security_question').choices).get(user.security_question)
-            if user.check_security_answer(answer):
+            ip = throttle.client_ip(request)
+            if throttle.is_blocked('password_reset', uname, ip):
+                messages.error(request, 'Too many incorrect answers. Please wait a few minutes and try again.')
+                step, status = 2, 429
+            elif throttle.timed_check('password_reset', user.check_security_answer, answer):
+                throttle.clear('password_reset', uname)
                 step = 3
             else:
+                throttle.record_failure('password_reset', uname, ip)
                 messages.error(request, 'Incorrect answer')
                 step = 2
         elif 'new_password' in request.POST:
@@ -86,58 +115,65 @@ def forgot_password(request):
                     pass
                 messages.success(request, 'Password reset successful. Please login.')
                 return redirect('fees:login')
-    return render(request, 'fees/forgot_password.html', {'step': step, 'question': question})
+    return render(request, 'fees/forgot_password.html', {'step': step, 'question': question}, status=status)
 
 
 @login_required
 def dashboard(request):
-    total_students = Student.objects.count()
-    current_month_str = datetime.now().strftime('%B %Y')
-    
-    collected = FeePayment.objects.filter(date__month=datetime.now().month, date__year=datetime.now().year).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # ISSUE 2 Fix: Count of students with pending_amount > 0 for this month
-    active_students = Student.objects.filter(is_active=True)
-    pending_count = 0
-    records = {r.student_id: r for r in FeeRecord.objects.filter(month=current_month_str)}
-    for student in active_students:
-        record = records.get(student.id)
-        if record:
-            if record.pending_amount > 0:
-                pending_count += 1
-        else:
-            # No record for current month means it's pending
-            pending_count += 1
-    
-    total_expected = 0
-    class_fees = {cf.student_class: cf.fee_amount for cf in ClassFee.objects.all()}
-    for student in Student.objects.all():
-        total_expected += float(class_fees.get(student.student_class, student.total_fees))
-    
-    collection_rate = 0
-    if total_expected > 0:
-        collection_rate = int((float(collected) / float(total_expected)) * 100)
-
-    chart_labels = []
-    chart_data = []
-    for i in range(5, -1, -1):
-        target_date = datetime.now() - timedelta(days=i*30)
-        month_label = target_date.strftime('%b')
-        chart_labels.append(month_label)
-        month_revenue = FeePayment.objects.filter(date__month=target_date.month, date__year=target_date.year).aggregate(total=Sum('amount'))['total'] or 0
-        chart_data.append(float(month_revenue))
-
-    recent_payments = FeePayment.objects.select_related('student').order_by('-date')[:10]
-    
-    return render(request, 'fees/dashboard.html', {
-        'total_students': total_students,
-        'collected': collected,
-        'pending': pending_count,
-        'collection_rate': collection_rate,
-        'recent_payments': recent_payments,
-        'chart_labels_json': json.dumps(chart_labels),
-        'chart_data_json': json.dumps(chart_data),
-    })
+    # Safety net for the monthly generate_fee_records job; no-op once the month is done
+    if ledger.ensure_month_records():
+        invalidate_fee_stats()
+    # The cards, chart and recent payments are fetched by the page from the async endpoints below
+    return render(request, 'fees/dashboard.html')
+
+
+async def _api_user(request):
+    """The signed-in user for an async view, or None (request.auser() is Django 5.0+)."""
+    if hasattr(request, 'auser'):
+        user = await request.auser()
+    else:
+        user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    return user if user and user.is_authenticated else None
+
+
+async def dashboard_kpis(request):
+    if not await _api_user(request):
+        return JsonResponse({'error': 'Login required.'}, status=401)
+    return JsonResponse(await stats.aget_kpis())
+
+
+async def dashboard_revenue(request):
+    if not await _api_user(request):
+        return JsonResponse({'error': 'Login required.'}, status=401)
+    series = await stats.aget_revenue_series()
+    return JsonResponse({'labels': series['chart_labels'], 'data': series['chart_data']})
+
+
+async def dashboard_recent_payments(request):
+    if not await _api_user(request):
+        return JsonResponse({'error': 'Login required.'}, status=401)
+    modes = dict(FeePayment.PAYMENT_CHOICES)
+    payments = [{
+        'id': p.id,
+        'student': p.student.name,
+        'roll_no': p.student.roll_no,
+        'amount': str(p.amount),
+        'payment_mode': modes.get(p.payment_mode, p.payment_mode),
+        'date': dateformat.format(p.date, 'F d, Y'),
+        'receipt_url': reverse('fees:generate_receipt', args=[p.id]),
+    } async for p in FeePayment.objects.select_related('student').order_by('-date')[:10]]
+    return JsonResponse({'payments': payments})
+
+
+# Columns manage_list can sort on, mapped to the ORM path used for the keyset ordering
+SORT_FIELDS = {
+    'student': {'name': 'name', 'roll_no': 'roll_no', 'student_class': 'student_class', 'is_active': 'is_active'},
+    'classfee': {'student_class': 'student_class', 'fee_amount': 'fee_amount'},
+    'feepayment': {'student': 'student__name', 'amount': 'amount', 'payment_mode': 'payment_mode', 'date': 'date'},
+    'feerecord': {'student': 'student__name', 'month': 'period', 'status': 'status', 'paid_amount': 'paid_amount', 'pending_amount': 'pending_amount'},
+    'customuser': {'username': 'username', 'email': 'email', 'is_staff': 'is_staff', 'is_active': 'is_active'},
+    'group': {'name': 'name'},
+}
 
 
 @login_required
@@ -189,6 +225,7 @@ def manage_list(request, model_name):
 
             try:
                 model.objects.filter(pk__in=ids_int).delete()
+                invalidate_count(model)
                 messages.success(request, f"Selected {title} deleted successfully.")
             except Exception:
                 messages.error(request, f"Cannot delete this {model_name}. It may have related records. Please delete related records first.")
@@ -196,6 +233,8 @@ def manage_list(request, model_name):
         return redirect('fees:manage_list', model_name=model_name)
 
     objects = model.objects.all()
+    if model_name in ['feerecord', 'feepayment']:
+        objects = objects.select_related('student')
     
     # Initialize total_students for all models (default to 0)
     total_students = 0
@@ -212,7 +251,7 @@ def manage_list(request, model_name):
             available_classes = []
         
         # Get TOTAL student count BEFORE filtering
-        total_students = Student.objects.count()
+        total_students = cached_count(Student.objects.all())
         
         # Get selected class from query parameter
         selected_class = request.GET.get('class', '')
@@ -237,19 +276,55 @@ def manage_list(request, model_name):
     q = request.GET.get('q')
     if q:
         if model_name == 'student':
-            objects = objects.filter(name__icontains=q) | objects.filter(roll_no__icontains=q)
+            objects = search.filter_students(objects, q)
         elif model_name == 'customuser':
             objects = objects.filter(username__icontains=q)
-            
+
+    # Keyset pagination over (sort column, pk) instead of rendering every row
+    sort_fields = SORT_FIELDS[model_name]
+    sort = request.GET.get('sort', '')
+    descending = sort.startswith('-')
+    sort_name = sort.lstrip('-')
+    if sort_name not in sort_fields:
+        sort_name, descending = None, False
+    rows, next_cursor, prev_cursor = keyset_page(
+        objects, sort_fields.get(sort_name, 'pk'), descending,
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    total_count = cached_count(objects)
+
+    query = request.GET.copy()
+    for key in ('after', 'before', 'sort'):
+        query.pop(key, None)
+    columns = []
+    for field in fields:
+        column = {'name': field, 'sort_url': None, 'direction': None}
+        if field in sort_fields:
+            if field == sort_name:
+                column['direction'] = 'desc' if descending else 'asc'
+            query['sort'] = f'-{field}' if column['direction'] == 'asc' else field
+            column['sort_url'] = '?' + query.urlencode()
+        columns.append(column)
+    if sort_name:
+        query['sort'] = sort
+    else:
+        query.pop('sort', None)
+    page_query = query.urlencode()
+
     return render(request, 'fees/generic_list.html', {
-        'objects': objects,
+        'objects': rows,
         'fields': fields,
+        'columns': columns,
         'title': title,
         'model_name': model_name,
         'readonly': readonly,
         'available_classes': available_classes,
         'selected_class': selected_class,
         'total_students': total_students,
+        'total_count': total_count,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'page_query': page_query,
     })
 
 
@@ -302,6 +377,7 @@ def manage_form(request, model_name, pk=None):
         form = form_class(request.POST, request.FILES, instance=instance)
         if form.is_valid():
             form.save()
+            invalidate_count(model)
             label = MODEL_LABELS.get(model_name, model_name.replace('_', ' ').title())
             messages.success(request, f"{label} saved successfully.")
             return redirect('fees:manage_list', model_name=model_name)
@@ -317,54 +393,49 @@ def manage_form(request, model_name, pk=None):
 
 @login_required
 def monthly_fees(request):
-    now = datetime.now()
-    y, m = now.year, now.month
-    # go back 11 months
-    start_date = date(y, m, 1) - timedelta(days=330)
-    y, m = start_date.year, start_date.month
-    
-    months = []
-    for _ in range(12):
-        label = date(y, m, 1).strftime('%B %Y')
-        months.append({'year': y, 'month': m, 'label': label})
-        if m == 12: m = 1; y += 1
-        else: m += 1
+    start = parse_month_param(request.GET.get('start'))
+    end = parse_month_param(request.GET.get('end'))
+    if start and end and start <= end:
+        months = month_range(start, end)
+    else:
+        months = last_months(12)
 
     students = Student.objects.all()
-    table = []
-    for student in students:
-        row = {'student': student, 'amounts': []}
-        for mo in months:
-            payment_sum = FeePayment.objects.filter(student=student, date__year=mo['year'], date__month=mo['month']).aggregate(total=Sum('amount'))['total']
-            if payment_sum:
-                row['amounts'].append(float(payment_sum))
-            else:
-                try:
-                    record = FeeRecord.objects.get(student=student, month=mo['label'])
-                    if record.status == 'Paid':
-                        cf = ClassFee.objects.filter(student_class=student.student_class).first()
-                        row['amounts'].append(float(cf.fee_amount if cf else student.total_fees))
-                    else: row['amounts'].append(None)
-                except FeeRecord.DoesNotExist: row['amounts'].append(None)
-        table.append(row)
+    selected_class = request.GET.get('class') or None
+    if selected_class:
+        students = students.filter(student_class=selected_class)
+    available_classes = Student.objects.values_list('student_class', flat=True).distinct().order_by('student_class')
+
+    if request.GET.get('export') == 'csv':
+        response = StreamingHttpResponse(stream_monthly_csv(students, months), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="monthly_summary.csv"'
+        return response
+    if request.GET.get('export') == 'xlsx':
+        from .utils.reports_excel import export_monthly_to_excel
+        return FileResponse(
+            export_monthly_to_excel(students, months),
+            as_attachment=True,
+            filename='monthly_summary.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
 
     current = months[-1]
-    students = Student.objects.filter(is_active=True)
-    total_expected = sum(float(s.get_total_fee()) for s in students)
-    total_collected = float(FeePayment.objects.filter(date__year=current['year'], date__month=current['month']).aggregate(total=Sum('amount'))['total'] or 0)
+    total_expected = float(students.filter(is_active=True).aggregate(total=Sum(ledger.expected_fee_expression()))['total'] or 0)
+    total_collected = float(FeePayment.objects.filter(
+        student__in=students, date__year=current['year'], date__month=current['month']
+    ).aggregate(total=Sum('amount'))['total'] or 0)
     total_pending = total_expected - total_collected
 
-    if request.GET.get('export') == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="monthly_summary.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['Student'] + [m['label'] for m in months])
-        for row in table:
-            writer.writerow([row['student'].name] + [('' if v is None else f"{v:.2f}") for v in row['amounts']])
-        return response
+    page = Paginator(students.order_by('roll_no'), MONTHLY_PAGE_SIZE).get_page(request.GET.get('page'))
+    table = monthly_pivot(page.object_list, months)
 
+    query = request.GET.copy()
+    query.pop('page', None)
     return render(request, 'fees/monthly_fees.html', {
         'months': months, 'table': table, 'total_expected': total_expected, 'total_collected': total_collected, 'total_pending': total_pending,
+        'page_obj': page, 'available_classes': available_classes, 'selected_class': selected_class,
+        'start': f"{months[0]['year']}-{months[0]['month']:02d}", 'end': f"{current['year']}-{current['month']:02d}",
+        'querystring': query.urlencode(),
     })
 
 @login_required
@@ -373,55 +444,238 @@ def set_theme(request):
         theme = request.POST.get('theme')
         if theme:
             request.user.theme_preference = theme
-            request.user.save()
+            request.user.save(update_fields=['theme_preference'])
             return JsonResponse({'status': 'ok'})
     return JsonResponse({'status': 'error'}, status=400)
 
+@login_required
+def student_search(request):
+    if not request.user.has_perm('fees.view_student') and not request.user.is_superuser:
+        return JsonResponse({'results': []}, status=403)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', search.TYPEAHEAD_LIMIT)), 50))
+    except ValueError:
+        limit = search.TYPEAHEAD_LIMIT
+    return JsonResponse({'results': search.typeahead(request.GET.get('q', ''), limit)})
+
 @login_required
 def students_list(request): return redirect('fees:manage_list', model_name='student')
 
 @login_required
 def paid_students_list(request):
-    current_month = datetime.now().strftime('%B %Y')
-    records = FeeRecord.objects.filter(month=current_month)
-    paid_ids = [r.student_id for r in records if r.pending_amount <= 0]
-    return render(request, 'fees/generic_list.html', {
-        'objects': Student.objects.filter(id__in=paid_ids),
-        'title': f'Paid - {current_month}',
-        'fields': ['name', 'roll_no', 'student_class'],
-        'model_name': 'student',
-        'readonly': True
-    })
+    return _fee_status_list(request, paid=True)
 
 @login_required
 def unpaid_students_list(request):
-    current_month = datetime.now().strftime('%B %Y')
-    records = FeeRecord.objects.filter(month=current_month)
-    unpaid_ids = [r.student_id for r in records if r.pending_amount > 0]
-    # Also include students without a record for the current month
-    all_active_ids = Student.objects.filter(is_active=True).values_list('id', flat=True)
-    recorded_ids = records.values_list('student_id', flat=True)
-    unrecorded_ids = [i for i in all_active_ids if i not in recorded_ids]
-    
-    final_ids = list(unpaid_ids) + list(unrecorded_ids)
-    
-    return render(request, 'fees/generic_list.html', {
-        'objects': Student.objects.filter(id__in=final_ids),
-        'title': f'Unpaid - {current_month}',
-        'fields': ['name', 'roll_no', 'student_class'],
-        'model_name': 'student',
-        'readonly': True
+    return _fee_status_list(request, paid=False)
+
+def _fee_status_list(request, paid):
+    period = parse_month_param(request.GET.get('month')) or date.today().replace(day=1)
+    selected_class = request.GET.get('class') or None
+    students = fee_status_students(period, paid, selected_class)
+    label = 'paid' if paid else 'unpaid'
+
+    if request.GET.get('export') == 'csv':
+        response = StreamingHttpResponse(stream_status_csv(students), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{label}_{period:%Y_%m}.csv"'
+        return response
+
+    totals = students.aggregate(count=Count('pk'), paid=Sum('paid_amount'), pending=Sum('pending_amount'))
+    rows, next_cursor, prev_cursor = keyset_page(
+        students, 'roll_no', after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    query = request.GET.copy()
+    for key in ('after', 'before', 'export'):
+        query.pop(key, None)
+    return render(request, 'fees/fee_status_list.html', {
+        'title': f"{label.capitalize()} - {period:%B %Y}",
+        'paid': paid,
+        'rows': rows,
+        'totals': totals,
+        'month': f'{period:%Y-%m}',
+        'available_classes': Student.objects.values_list('student_class', flat=True).distinct().order_by('student_class'),
+        'selected_class': selected_class,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'querystring': query.urlencode(),
+    })
+
+@login_required
+def aging_report(request):
+    # Snapshots are taken by the nightly snapshot_aging command, never in a request: a full one
+    # holds the database write lock for seconds
+    selected_class = request.GET.get('class') or None
+    rows = student_aging(selected_class)
+    snapshot = AgingSnapshot.objects.order_by('-date').first()
+    if request.GET.get('export') == 'csv':
+        response = StreamingHttpResponse(stream_aging_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="aging_{snapshot.date if snapshot else date.today()}.csv"'
+        return response
+
+    # Everything below reads the precomputed snapshot tables, never FeeRecord
+    classes = list(snapshot.classes.order_by('student_class')) if snapshot else []
+    shown = [c for c in classes if not selected_class or c.student_class == selected_class]
+    totals = {field: sum((getattr(c, field) for c in shown), 0) for field in aging.BUCKETS + ['total', 'students']}
+    trend = aging_trend(selected_class)
+    page, next_cursor, prev_cursor = keyset_page(
+        rows, 'total', descending=True, after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    query = request.GET.copy()
+    for key in ('after', 'before', 'export'):
+        query.pop(key, None)
+    return render(request, 'fees/aging_report.html', {
+        'snapshot': snapshot,
+        'buckets': [(field, aging.BUCKET_LABELS[field], totals[field]) for field in aging.BUCKETS],
+        'totals': totals,
+        'classes': classes,
+        'rows': page,
+        'trend': {
+            'labels': [row['snapshot__date'].isoformat() for row in trend],
+            'series': [{'label': aging.BUCKET_LABELS[field], 'data': [float(row[field] or 0) for row in trend]}
+                       for field in aging.BUCKETS],
+        },
+        'available_classes': Student.objects.values_list('student_class', flat=True).distinct().order_by('student_class'),
+        'selected_class': selected_class,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'querystring': query.urlencode(),
     })
 
 @login_required
 def generate_receipt(request, payment_id):
-    payment = get_object_or_404(FeePayment, id=payment_id)
-    return HttpResponse(generate_payment_receipt(payment), content_type='application/pdf')
+    payment = get_object_or_404(FeePayment.objects.select_related('student'), id=payment_id)
+    path, digest = receipt_cache.get_receipt(payment)
+    etag = f'"{digest}"'
+    last_modified = int(path.stat().st_mtime)
+    # Repeat downloads revalidate and get a 304 instead of the PDF
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(open(path, 'rb'), content_type='application/pdf',
+                                filename=f'receipt-REC-{payment.id:06d}.pdf')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def batch_documents_view(request):
+    from .utils.pdf_batch import (
+        WEB_MAX_DAYS, WEB_MAX_DOCUMENTS, batch_documents, count_documents, default_range, render_merged, render_zip,
+    )
+    kind = request.GET.get('kind')
+    available_classes = Student.objects.values_list('student_class', flat=True).distinct().order_by('student_class')
+    if kind not in ('receipts', 'statements'):
+        return render(request, 'fees/batch_documents.html', {'available_classes': available_classes})
+
+    default_start, default_end = default_range(kind)
+    try:
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') else default_start
+        end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else default_end
+    except ValueError:
+        messages.error(request, 'Dates must look like YYYY-MM-DD.')
+        return redirect('fees:batch_documents')
+    if start > end or (end - start).days > WEB_MAX_DAYS:
+        messages.error(request, f'Choose a date range of at most {WEB_MAX_DAYS} days.')
+        return redirect('fees:batch_documents')
+    # Rendered in this worker, so big batches are left to the render_pdfs command
+    count = count_documents(kind, start, end, request.GET.get('class'))
+    if count > WEB_MAX_DOCUMENTS:
+        messages.error(request, f'{count} {kind} match that selection; narrow it to at most {WEB_MAX_DOCUMENTS} '
+                                f'or use "python manage.py render_pdfs".')
+        return redirect('fees:batch_documents')
+    documents = batch_documents(kind, start, end, request.GET.get('class'))
+    if not documents:
+        messages.error(request, f'No {kind} match that selection.')
+        return redirect('fees:batch_documents')
+
+    if request.GET.get('format') == 'pdf':
+        return FileResponse(render_merged(documents), as_attachment=True, filename=f'{kind}.pdf',
+                            content_type='application/pdf')
+    return FileResponse(render_zip(documents, workers=1), as_attachment=True, filename=f'{kind}.zip',
+                        content_type='application/zip')
 
 @login_required
 def export_fees_excel(request):
     from .utils.reports_excel import export_fees_to_excel
-    buffer = export_fees_to_excel(FeeRecord.objects.all())
-    response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="fms_report.xlsx"'
-    return response
+    records = FeeRecord.objects.order_by('student__roll_no', 'period')
+    month = parse_month_param(request.GET.get('month'))
+    if month:
+        records = records.filter(period=month)
+    if request.GET.get('class'):
+        records = records.filter(student__student_class=request.GET['class'])
+    if request.GET.get('status') in ('Paid', 'Unpaid'):
+        records = records.filter(status=request.GET['status'])
+    return FileResponse(
+        export_fees_to_excel(records),
+        as_attachment=True,
+        filename='fms_report.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+@login_required
+def import_payments_view(request):
+    from .utils.payment_import import import_payments, read_rows, validate_rows
+    if not request.user.has_perm('fees.add_feepayment') and not request.user.is_superuser:
+        messages.error(request, "You don't have permission to add fee payments.")
+        return redirect('fees:manage_list', model_name='feepayment')
+
+    errors = []
+    if request.method == 'POST':
+        form = PaymentImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                payments, errors = validate_rows(read_rows(upload.file, upload.name))
+            except ValueError as e:
+                form.add_error('file', str(e))
+            else:
+                if not errors and not payments:
+                    form.add_error('file', 'The file has no payment rows.')
+                elif not errors:
+                    refreshed = import_payments(payments)
+                    invalidate_count(FeePayment)
+                    messages.success(request, f"Imported {len(payments)} payments and updated {refreshed} fee records.")
+                    return redirect('fees:manage_list', model_name='feepayment')
+    else:
+        form = PaymentImportForm()
+    return render(request, 'fees/import_payments.html', {'form': form, 'errors': errors})
+
+@login_required
+def request_metrics(request):
+    if not request.user.is_superuser:
+        messages.error(request, "Access Denied: Admin only.")
+        return redirect('fees:dashboard')
+    if request.method == 'POST':
+        metrics.reset()
+        throttle.reset_stats()
+        return redirect('fees:request_metrics')
+    return render(request, 'fees/request_metrics.html', {
+        'rows': metrics.summary(),
+        'throttle_rows': throttle.summary(),
+        'enabled': settings.FMS_REQUEST_METRICS,
+        'window': metrics.WINDOW,
+    })
+
+@login_required
+def profile_list(request):
+    if not request.user.is_superuser:
+        messages.error(request, "Access Denied: Admin only.")
+        return redirect('fees:dashboard')
+    return render(request, 'fees/profile_list.html', {
+        'profiles': profiling.list_profiles(),
+        'enabled': settings.FMS_PROFILING,
+    })
+
+@login_required
+def profile_detail(request, name):
+    if not request.user.is_superuser:
+        messages.error(request, "Access Denied: Admin only.")
+        return redirect('fees:dashboard')
+    path = profiling.profile_path(name)
+    if path is None:
+        raise Http404('No such profile')
+    if request.GET.get('download'):
+        # Raw pstats dump, for snakeviz or python -m pstats
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
+    total, rows = profiling.top_functions(path)
+    return render(request, 'fees/profile_detail.html', {'name': name, 'total': total * 1000, 'rows': rows})
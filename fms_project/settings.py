@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+import django
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get('DJANGO_SECRET', 'dev-secret-change-me')
@@ -20,11 +22,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'fees.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'fees.middleware.SessionRefreshMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'fees.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,6 +70,7 @@ SIDEBAR_CONFIG = [
             {"label": "Students", "url": "fees:manage_list", "args": ["student"], "icon": "🎓"},
             {"label": "Class Fees", "url": "fees:manage_list", "args": ["classfee"], "icon": "🏷️"},
             {"label": "Fee Payments", "url": "fees:manage_list", "args": ["feepayment"], "icon": "💳"},
+            {"label": "Import Payments", "url": "fees:import_payments", "icon": "📥"},
             {"label": "Fee Records", "url": "fees:manage_list", "args": ["feerecord"], "icon": "📝"},
         ]
     },
@@ -74,6 +80,8 @@ SIDEBAR_CONFIG = [
             {"label": "Monthly Summary", "url": "fees:monthly_fees", "icon": "📅"},
             {"label": "Paid Students", "url": "fees:paid_students_list", "icon": "✅"},
             {"label": "Unpaid Students", "url": "fees:unpaid_students_list", "icon": "❌"},
+            {"label": "Aging Report", "url": "fees:aging_report", "icon": "⏳"},
+            {"label": "Print Documents", "url": "fees:batch_documents", "icon": "🖨️"},
         ]
     },
     {
@@ -85,6 +93,7 @@ SIDEBAR_CONFIG = [
 ]
 
 WSGI_APPLICATION = 'fms_project.wsgi.application'
+ASGI_APPLICATION = 'fms_project.asgi.application'
 
 DATABASES = {
     'default': {
@@ -93,6 +102,50 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile (FMS_SQLITE_TUNING=1): WAL so readers and writers stop blocking each
+# other, pragmas applied to every new connection (fees.sqlite) and connections kept between requests.
+FMS_SQLITE_TUNING = os.environ.get('FMS_SQLITE_TUNING') == '1'
+FMS_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',     # safe with WAL; fsync at checkpoints instead of every commit
+    'busy_timeout': 5000,        # ms to wait for a writer instead of failing with "database is locked"
+    'cache_size': -20000,        # KiB, i.e. ~20 MB of page cache per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+if FMS_SQLITE_TUNING:
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if django.VERSION >= (5, 1):
+        # Take the write lock at BEGIN, so a read that turns into a write can't deadlock under WAL
+        DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Shared between worker processes so signal-driven invalidation (fees.stats) reaches all of them.
+# Besides the stats it holds one list count per distinct filter (fees.pagination, 60 s each) and
+# long-lived version stamps; past MAX_ENTRIES the file cache deletes a third of its files at
+# random, stamps included, so leave plenty of room above Django's default of 300.
+FMS_CACHE_DIR = os.environ.get('FMS_CACHE_DIR', str(BASE_DIR / '.cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': FMS_CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Cache-backed sessions get their own store: a full cache culls a third of its entries at
+    # random, which would log users out (or force cached_db back to the database)
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(FMS_CACHE_DIR, 'sessions'),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Failed-login counters (fees.throttle), apart from everything else for the same reason
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(FMS_CACHE_DIR, 'throttle'),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -124,8 +177,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'fees.CustomUser'
 
+# Runs the tests against in-memory caches and throwaway directories instead of .cache/.receipts
+TEST_RUNNER = 'fees.tests.runner.TestRunner'
+
 SESSION_COOKIE_AGE = 1800  # 30 minutes
-SESSION_SAVE_EVERY_REQUEST = True
+# Expiry still slides with activity, but fees.middleware.SessionRefreshMiddleware re-saves an
+# unchanged session at most every SESSION_REFRESH_INTERVAL seconds instead of on every request
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = 300
+# FMS_SESSION_ENGINE: db (default), cached_db, cache, or signed_cookies (no server-side writes at all)
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get('FMS_SESSION_ENGINE', 'db')
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Per-request timing/SQL metrics (Server-Timing headers and the superuser metrics page)
+FMS_REQUEST_METRICS = os.environ.get('FMS_REQUEST_METRICS') == '1'
+
+# Superusers can profile a request with ?_profile=1 (saved under FMS_PROFILE_DIR, listed at /profiles/)
+FMS_PROFILING = os.environ.get('FMS_PROFILING') == '1'
+FMS_PROFILE_DIR = os.environ.get('FMS_PROFILE_DIR', str(BASE_DIR / '.profiles'))
+
+# Failed logins / security answers allowed before fees.throttle refuses to check more
+FMS_THROTTLE = os.environ.get('FMS_THROTTLE', '1') == '1'
+FMS_THROTTLE_RATES = {
+    # scope: (failures per username, failures per client IP, sliding window in seconds)
+    'login': (5, 30, 300),
+    'password_reset': (5, 20, 900),
+}
+
+# Rendered receipt PDFs, keyed by payment and content fingerprint (see fees.receipt_cache)
+FMS_RECEIPT_CACHE_DIR = os.environ.get('FMS_RECEIPT_CACHE_DIR', str(BASE_DIR / '.receipts'))
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'